@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+import asyncio
+import base64
+import json
 import re
+from datetime import datetime
+from typing import Optional, Tuple
 from models.database import (
-    get_all_sessions, get_session, get_session_logs,
-    delete_session, get_pool
+    get_sessions_page, get_session, get_session_logs, get_session_issue_counts,
+    get_session_report, save_session_report, delete_session, get_pool
 )
 from services.report_generator import ReportGenerator
 from middleware.auth import require_device_token, generate_device_token, TOKEN_HEADER
+from utils.assets import asset_url
+from utils.page_cache import RenderedPageCache
+from image_variants import image_url, image_srcset
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
+templates.env.globals["image_url"] = image_url
+templates.env.globals["image_srcset"] = image_srcset
+
+page_cache = RenderedPageCache(templates)
+
+# Session listing page sizes
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
 # UUID v4 pattern for session ID validation
 UUID_PATTERN = re.compile(r'^[a-f0-9]{8}-[a-f0-9]{4}-4[a-f0-9]{3}-[89ab][a-f0-9]{3}-[a-f0-9]{12}$', re.IGNORECASE)
@@ -27,7 +44,7 @@ def validate_session_id(session_id: str) -> bool:
 
 @router.get("/", response_class=HTMLResponse)
 async def landing_page(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return page_cache.response(request, "index.html")
 
 
 @router.get("/sessions", response_class=HTMLResponse)
@@ -57,47 +74,111 @@ async def create_device_token():
 
 # === Sessions API ===
 
+def encode_session_cursor(session: dict) -> str:
+    """Opaque cursor pointing just after a session in the newest-first listing."""
+    position = json.dumps([session["start_time"].isoformat(), session["id"]])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_session_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+    """(start_time, id) from a cursor, or None if it's malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_time, session_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(start_time), str(session_id)
+    except (ValueError, TypeError):
+        return None
+
+
 @router.get("/api/sessions")
-async def api_list_sessions(request: Request):
-    """List all sessions for the authenticated device."""
+async def api_list_sessions(request: Request, limit: int = DEFAULT_PAGE_SIZE, after: str = ""):
+    """
+    List the authenticated device's sessions, newest first, one page at a time.
+
+    Query params: limit (1-100), after (next_cursor from the previous page).
+    Returns {"sessions": [...], "next_cursor": "..." or null}.
+    """
     device_token = require_device_token(request)
-    sessions = await get_all_sessions(device_token)
-    return sessions
 
+    position = None
+    if after:
+        position = decode_session_cursor(after)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@router.get("/api/sessions/{session_id}")
-async def api_get_session(request: Request, session_id: str):
-    """Get a specific session (must belong to authenticated device)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sessions, has_more = await get_sessions_page(device_token, limit, position)
+    return {
+        "sessions": sessions,
+        "next_cursor": encode_session_cursor(sessions[-1]) if has_more else None
+    }
+
+
+async def load_session_report(session: dict, stored: Optional[dict], background_tasks: BackgroundTasks) -> dict:
+    """
+    A session's report: the one stored at session stop, or (for sessions saved
+    before reports existed or by an older algorithm version) recomputed from
+    the logs. A recomputed report is stored after the response is sent, so
+    reads never wait on (or fail with) a database write.
+    """
+    if stored and stored.get('algorithm_version') == ReportGenerator.ALGORITHM_VERSION:
+        return stored
+
+    issue_counts = await get_session_issue_counts(session['id'])
+    if issue_counts is None:
+        # Don't store a report built from a failed query
+        return {"common_issues": [], "recommendations": []}
+
+    report = ReportGenerator.build_report(
+        issue_counts,
+        good_posture_percentage=session.get('good_posture_percentage'),
+        average_score=session.get('average_score')
+    )
+    background_tasks.add_task(save_session_report, session['id'], report)
+    return report
+
+
+async def session_detail(
+    request: Request, session_id: str, include_logs: bool, background_tasks: BackgroundTasks
+) -> dict:
+    """Session, report and (optionally) logs, shared by the detail and export routes."""
     device_token = require_device_token(request)
 
     # Strict UUID validation
     if not validate_session_id(session_id):
         raise HTTPException(status_code=404, detail="Not found")
 
-    session = await get_session(session_id, device_token)
+    # The report lookup is a primary-key fetch; run it alongside the ownership check
+    session, stored_report = await asyncio.gather(
+        get_session(session_id, device_token), get_session_report(session_id)
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Not found")
 
-    logs = await get_session_logs(session_id)
+    report_loader = load_session_report(session, stored_report, background_tasks)
+    if include_logs:
+        logs, report = await asyncio.gather(get_session_logs(session_id), report_loader)
+    else:
+        logs, report = None, await report_loader
 
-    # Generate analysis
-    try:
-        common_issues = ReportGenerator.identify_common_issues(logs)
-        recommendations = ReportGenerator.get_recommendations(
-            common_issues,
-            good_posture_percentage=session.get('good_posture_percentage'),
-            average_score=session.get('average_score')
-        )
-    except Exception:
-        common_issues = []
-        recommendations = []
+    data = {"session": session}
+    if include_logs:
+        data["logs"] = logs
+    data["common_issues"] = report["common_issues"]
+    data["recommendations"] = report["recommendations"]
+    return data
 
-    return {
-        "session": session,
-        "logs": logs,
-        "common_issues": common_issues,
-        "recommendations": recommendations
-    }
+
+@router.get("/api/sessions/{session_id}")
+async def api_get_session(
+    request: Request, session_id: str, background_tasks: BackgroundTasks, include_logs: bool = True
+):
+    """
+    Get a specific session (must belong to authenticated device).
+    The report is the one stored when the session stopped;
+    include_logs=false skips fetching the raw logs entirely.
+    """
+    return await session_detail(request, session_id, include_logs, background_tasks)
 
 
 @router.delete("/api/sessions/{session_id}")
@@ -123,10 +204,9 @@ async def api_delete_session(request: Request, session_id: str):
 
 
 @router.get("/api/sessions/{session_id}/export")
-async def api_export_session(request: Request, session_id: str):
+async def api_export_session(request: Request, session_id: str, background_tasks: BackgroundTasks):
     """Export session data (must belong to authenticated device)."""
-    # This reuses the auth check from api_get_session
-    data = await api_get_session(request, session_id)
+    data = await session_detail(request, session_id, True, background_tasks)
     return JSONResponse(content=data)
 
 
@@ -2,9 +2,10 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import math
+import os
 import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import config as cfg
 from core.posture_analyzer import PostureAnalyzer
 from core.calibration import Calibrator
@@ -12,6 +13,7 @@ from services.session_manager import SessionManager
 from models.schemas import CalibrationProfile, PostureStatus
 from models.database import save_session, save_log
 from middleware.auth import validate_token_format
+from middleware.rate_limit import MemoryStore, TokenBucketLimiter, create_store
 from middleware.security import validate_websocket_origin
 from utils.debug import debug_log as _debug_log
 from utils.network import get_client_ip
@@ -28,24 +30,8 @@ MAX_PROFILE_SIZE = 10000  # 10KB max profile JSON size
 
 # === RATE LIMITER ===
 
-class RateLimiter:
-    """Simple rate limiter to prevent message spam."""
-    def __init__(self, max_messages: int = 10, window_seconds: float = 1.0):
-        self.max_messages = max_messages
-        self.window_seconds = window_seconds
-        self.messages: list = []
-
-    def is_allowed(self) -> bool:
-        """Returns True if message is allowed, False if rate limited."""
-        now = time.time()
-        # Remove old messages outside the window
-        self.messages = [t for t in self.messages if now - t < self.window_seconds]
-
-        if len(self.messages) >= self.max_messages:
-            return False
-
-        self.messages.append(now)
-        return True
+# Per-connection message limiter (15 messages/second), keyed by connection
+message_limiter = TokenBucketLimiter(rate=15, burst=15)
 
 
 # === UTILITY FUNCTIONS ===
@@ -94,34 +80,87 @@ def validate_score(value) -> float:
 # === CONNECTION LIMITER ===
 
 class ConnectionLimiter:
-    """Limits concurrent WebSocket connections per IP to prevent resource exhaustion."""
+    """
+    Limits concurrent WebSocket connections per IP to prevent resource exhaustion.
+    Counts live in a limiter store, so with the shared backend the limit
+    applies across all workers on the host.
+
+    Each connection holds one of max_per_ip seats for its IP, recorded with
+    the pid of the worker serving it, so seats held by a worker that died
+    without releasing them are reclaimed on the next check.
+    """
 
-    def __init__(self, max_per_ip: int = 5):
+    # Backstop for seats whose pid was reused before they could be reclaimed
+    SEAT_TTL_SECONDS = 2 * 60 * 60
+
+    def __init__(self, max_per_ip: int = 5, store=None):
         self.max_per_ip = max_per_ip
-        self.connections: Dict[str, int] = {}
+        # Store records are (expires at, pid), keyed (ip, seat)
+        self.store = store if store is not None else MemoryStore()
+        self.pid = os.getpid()
+        # Seats held by this process, returned to the store on shutdown
+        self.local: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
 
-    def can_connect(self, websocket: WebSocket) -> bool:
-        """Check if a new connection is allowed for this IP."""
-        ip = get_client_ip(websocket)
-        current = self.connections.get(ip, 0)
-        return current < self.max_per_ip
+    def _seat_free(self, key, now: float) -> bool:
+        """True if the seat is empty, expired or held by a dead worker (which is then cleared)."""
+        record = self.store.get(key)
+        if record is None:
+            return True
+        expires_at, pid = record
+        if expires_at > now and (int(pid) == self.pid or self._pid_alive(int(pid))):
+            return False
+        self.store.delete(key)
+        return True
 
-    def add_connection(self, websocket: WebSocket) -> str:
-        """Track a new connection. Returns the IP."""
+    def try_add_connection(self, websocket: WebSocket) -> Optional[str]:
+        """Reserve a connection slot for this IP. Returns the IP, or None if at the limit."""
         ip = get_client_ip(websocket)
-        self.connections[ip] = self.connections.get(ip, 0) + 1
+        now = time.time()
+        with self.store.locked():
+            for seat in range(self.max_per_ip):
+                if self._seat_free((ip, seat), now):
+                    break
+            else:
+                return None
+            if not self.store.set((ip, seat), now + self.SEAT_TTL_SECONDS, self.pid, evict=False):
+                # Evicting would free another IP's live seat; refuse instead
+                _debug_log("[WS] Connection table full, rejecting connection")
+                return None
+        self.local.setdefault(ip, []).append(seat)
         return ip
 
     def remove_connection(self, ip: str):
         """Remove a connection from tracking."""
-        if ip in self.connections:
-            self.connections[ip] -= 1
-            if self.connections[ip] <= 0:
-                del self.connections[ip]
+        seats = self.local.get(ip)
+        if not seats:
+            return
+        seat = seats.pop()
+        if not seats:
+            del self.local[ip]
+        with self.store.locked():
+            self.store.delete((ip, seat))
+
+    def release_all(self):
+        """Give back this process's seats (on shutdown, so other workers don't inherit them)."""
+        with self.store.locked():
+            for ip, seats in self.local.items():
+                for seat in seats:
+                    self.store.delete((ip, seat))
+        self.local.clear()
 
 
 # Global connection limiter
-connection_limiter = ConnectionLimiter(max_per_ip=5)
+connection_limiter = ConnectionLimiter(max_per_ip=5, store=create_store("ws-connections"))
 
 
 # === WEBSOCKET ENDPOINT ===
@@ -133,13 +172,17 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close(code=4000, reason="Connection rejected")
         return
 
-    # Check connection limit per IP
-    if not connection_limiter.can_connect(websocket):
+    # Check connection limit per IP (reserves a slot if allowed)
+    client_ip = connection_limiter.try_add_connection(websocket)
+    if client_ip is None:
         await websocket.close(code=4000, reason="Connection rejected")
         return
 
-    await websocket.accept()
-    client_ip = connection_limiter.add_connection(websocket)
+    try:
+        await websocket.accept()
+    except Exception:
+        connection_limiter.remove_connection(client_ip)
+        raise
 
     # Profile is now stored client-side (localStorage)
     # We receive it from the client when they connect or after calibration
@@ -148,7 +191,7 @@ async def websocket_endpoint(websocket: WebSocket):
     calibrator = Calibrator()
     session_manager = SessionManager()
     audio_enabled = True
-    rate_limiter = RateLimiter(max_messages=15, window_seconds=1.0)
+    limiter_key = id(websocket)
     session_saved = False  # Flag to prevent double-save
     device_token: Optional[str] = None  # Device token for session ownership
 
@@ -170,7 +213,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 continue
 
             # Rate limiting - skip processing if too many messages
-            if not rate_limiter.is_allowed():
+            if not message_limiter.hit(limiter_key)[0]:
                 continue
 
             try:
@@ -392,6 +435,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 success, error = await save_log(log_data)
                 if success:
                     session_manager.log_count += 1
+                    session_manager.record_issues(issues)
                 else:
                     _debug_log(f"[LOG] Save failed: {error}")
 
@@ -404,8 +448,9 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         _debug_log(f"[WS] Connection error: {e}")
     finally:
-        # Always release connection slot
+        # Always release connection slot and message budget
         connection_limiter.remove_connection(client_ip)
+        message_limiter.reset(limiter_key)
 
     # Auto-save session if it was active and not already saved
     if session_manager.is_active and not session_saved:
@@ -14,6 +14,9 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
+# Connections opened at startup (and kept warm) / upper bound per worker
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
 
 # Posture Thresholds
 FORWARD_HEAD_THRESHOLD_CM = 5.0
@@ -62,6 +65,13 @@ if ENVIRONMENT == "development":
 # Rate limiting
 RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv("RATE_LIMIT_RPM", "120"))
 RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "30"))
+# "memory" (per worker process) or "shared" (one set of limits for all workers on this host)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SHARED_DIR = os.getenv("RATE_LIMIT_SHARED_DIR", "/dev/shm")  # tmpfs for the shared limiter files
+
+# Extra request-validation rules (optional): text files with one literal per line
+SUSPICIOUS_PATTERNS_FILE = os.getenv("SUSPICIOUS_PATTERNS_FILE", "")
+BLOCKED_AGENTS_FILE = os.getenv("BLOCKED_AGENTS_FILE", "")
 
 # Session security
 _default_secret = "dev-secret-change-in-production"
@@ -91,6 +101,15 @@ COOKIE_SECURE = ENVIRONMENT == "production"
 COOKIE_HTTPONLY = True
 COOKIE_SAMESITE = "strict"
 
+# Response compression for dynamic JSON (static files are precompressed at build time)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # Bytes; smaller bodies aren't worth it
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip 1 (fastest) - 9 (smallest)
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "8"))
+
+# Voice generation backend: "edge" (Edge TTS, needs network) or "silent" (offline stand-in for load tests)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "edge")
+
 # Data retention policy (GDPR/privacy compliance)
 # Sessions older than this will be automatically deleted
 DATA_RETENTION_DAYS = int(os.getenv("DATA_RETENTION_DAYS", "90"))  # Default 90 days
@@ -0,0 +1,202 @@
+"""
+Responsive Image Variants
+Resized WebP/JPEG/PNG copies of the site's raster images, generated at build
+time (scripts/build_assets.py) or on first request and cached on disk by
+content hash. Only depends on the standard library (Pillow is imported when a
+variant is actually generated) so scripts can import it without the app's
+configuration.
+"""
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+STATIC_DIR = Path("static")
+VARIANT_DIR = STATIC_DIR / "dist" / "img"
+
+# Only images below this prefix (relative to static/) are served as variants
+IMAGE_PREFIX = "images/"
+SOURCE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+# Allowed output widths; requests for anything else are rejected
+WIDTHS = (160, 320, 640, 1024)
+
+# Public URL prefix for the variant route
+URL_PREFIX = "/img"
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Output format -> (media type, file extension)
+FORMATS = {
+    "webp": ("image/webp", ".webp"),
+    "jpeg": ("image/jpeg", ".jpg"),
+    "png": ("image/png", ".png"),
+}
+
+HASH_LENGTH = 12
+
+
+class ImageVariantCache:
+    """Generates and caches resized image variants keyed by source content hash."""
+
+    def __init__(
+        self,
+        static_dir: Path = STATIC_DIR,
+        variant_dir: Path = VARIANT_DIR,
+        widths: Iterable[int] = WIDTHS,
+        url_prefix: str = URL_PREFIX
+    ):
+        self.static_dir = static_dir
+        self.variant_dir = variant_dir
+        self.widths = tuple(sorted(widths))
+        self.url_prefix = url_prefix
+        # {rel path: (mtime_ns, size, content hash, (width, height), has_alpha)}
+        self._sources: Dict[str, Tuple[int, int, str, Tuple[int, int], bool]] = {}
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        """'/static/images/x.png' or 'images/x.png' -> 'images/x.png'."""
+        path = path.split("?", 1)[0].lstrip("/")
+        if path.startswith("static/"):
+            path = path[len("static/"):]
+        return path
+
+    def resolve_source(self, path: str) -> Optional[Path]:
+        """Source file for a relative image path, or None if it isn't a servable image."""
+        rel_path = self.normalize(path)
+        if not rel_path.startswith(IMAGE_PREFIX) or Path(rel_path).suffix.lower() not in SOURCE_EXTENSIONS:
+            return None
+        root = self.static_dir.resolve()
+        source = (root / rel_path).resolve()
+        if root not in source.parents or not source.is_file():
+            return None
+        return source
+
+    def source_info(self, rel_path: str, source: Path) -> Tuple[str, Tuple[int, int], bool]:
+        """(content hash, size, has_alpha) for a source, cached until its mtime/size change."""
+        st = source.stat()
+        cached = self._sources.get(rel_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2], cached[3], cached[4]
+
+        from PIL import Image
+
+        digest = hashlib.sha256(source.read_bytes()).hexdigest()[:HASH_LENGTH]
+        with Image.open(source) as im:
+            dimensions = im.size
+            has_alpha = im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+        self._sources[rel_path] = (st.st_mtime_ns, st.st_size, digest, dimensions, has_alpha)
+        return digest, dimensions, has_alpha
+
+    @staticmethod
+    def choose_format(accept: str, has_alpha: bool) -> str:
+        """WebP when the client accepts it, else JPEG (PNG for images with transparency)."""
+        if "image/webp" in (accept or ""):
+            return "webp"
+        return "png" if has_alpha else "jpeg"
+
+    def get_variant(self, path: str, width: int, accept: str = "") -> Optional[Tuple[Path, str, str]]:
+        """
+        Return (file, media type, source hash) for a variant, generating it if needed.
+        Returns None if the path or width isn't allowed.
+
+        Blocking (image processing) - call via asyncio.to_thread from request handlers.
+        """
+        if width not in self.widths:
+            return None
+        source = self.resolve_source(path)
+        if source is None:
+            return None
+
+        rel_path = self.normalize(path)
+        digest, dimensions, has_alpha = self.source_info(rel_path, source)
+        fmt = self.choose_format(accept, has_alpha)
+        media_type, ext = FORMATS[fmt]
+        width = min(width, dimensions[0])  # Never upscale
+
+        stem = os.path.splitext(rel_path[len(IMAGE_PREFIX):])[0]
+        variant = self.variant_dir / f"{stem}-{width}w.{digest}{ext}"
+        if not variant.exists():
+            self._generate(source, variant, width, fmt)
+        return variant, media_type, digest
+
+    def _generate(self, source: Path, variant: Path, width: int, fmt: str):
+        """Resize and encode one variant, written atomically."""
+        from PIL import Image
+
+        variant.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = variant.with_name(f"{variant.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            with Image.open(source) as im:
+                if im.width > width:
+                    height = round(im.height * width / im.width)
+                    im = im.resize((width, height), Image.LANCZOS)
+                if fmt == "jpeg":
+                    im.convert("RGB").save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                elif fmt == "webp":
+                    im.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=6)
+                else:
+                    im.save(tmp_path, "PNG", optimize=True)
+            os.replace(tmp_path, variant)
+        finally:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def url(self, path: str, width: int) -> str:
+        """Versioned variant URL (the ?v= hash lets the response be cached as immutable)."""
+        rel_path = self.normalize(path)
+        source = self.resolve_source(rel_path)
+        if source is None:
+            return "/static/" + rel_path
+        digest, _, _ = self.source_info(rel_path, source)
+        return f"{self.url_prefix}/{width}/{rel_path}?v={digest}"
+
+    def srcset(self, path: str, max_width: Optional[int] = None) -> str:
+        """srcset value listing every variant width up to max_width (never above the source width)."""
+        rel_path = self.normalize(path)
+        source = self.resolve_source(rel_path)
+        if source is None:
+            return ""
+        _, dimensions, _ = self.source_info(rel_path, source)
+        limit = min(max_width or dimensions[0], dimensions[0])
+        widths = [w for w in self.widths if w <= limit]
+        return ", ".join(f"{self.url(rel_path, w)} {w}w" for w in widths)
+
+    def build_all(self, formats: Iterable[str] = ("webp", "jpeg")) -> int:
+        """Pre-generate every width for every source image. Returns the number of variants."""
+        count = 0
+        for source in sorted((self.static_dir / IMAGE_PREFIX).rglob("*")):
+            if source.suffix.lower() not in SOURCE_EXTENSIONS:
+                continue
+            rel_path = source.relative_to(self.static_dir).as_posix()
+            for width in self.widths:
+                for fmt in formats:
+                    accept = "image/webp" if fmt == "webp" else ""
+                    if self.get_variant(rel_path, width, accept):
+                        count += 1
+        return count
+
+
+image_variants = ImageVariantCache()
+
+
+def image_url(path: str, width: int) -> str:
+    """Jinja2 global: URL of a resized variant of a static image (the original if unavailable)."""
+    try:
+        return image_variants.url(path, width)
+    except (OSError, ImportError):
+        return "/static/" + image_variants.normalize(path)
+
+
+def image_srcset(path: str, max_width: Optional[int] = None) -> str:
+    """Jinja2 global: srcset attribute value for a static image."""
+    try:
+        return image_variants.srcset(path, max_width)
+    except (OSError, ImportError):
+        return ""
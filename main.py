@@ -1,22 +1,33 @@
 import uvicorn
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
-from api.routes import router as api_router
-from api.websocket import router as ws_router
-from models.database import init_db, close_pool, cleanup_old_sessions
+from api.routes import router as api_router, templates as api_templates
+from api.websocket import router as ws_router, connection_limiter
+from models.database import check_db, close_pool, cleanup_old_sessions
 from middleware.security import SecurityMiddleware, RequestValidationMiddleware, validate_websocket_origin
+from middleware.compression import CompressionMiddleware
+from middleware.cache_policy import IMMUTABLE, REVALIDATE
 from websocket_manager import ws_manager
 import asyncio
-from yoga_voice import generate_session_voice_script, test_tts_connectivity
 from services.session_manifest import generate_manifest
+from services.pose_catalog import get_pose_catalog
+from services.pose_search import get_pose_search
+from services.pose_pages import PosePages
+from services.warmup import warmup
 from services.audit_logger import ManifestValidator
 from utils.network import get_client_ip
+from utils.assets import asset_manifest, asset_url
+from utils.static_files import PrecompressedStaticFiles
+from utils.page_cache import RenderedPageCache, page_response
+from utils.startup import startup_report
+from image_variants import image_variants, image_url, image_srcset
 import os
+import re
+from typing import Optional
 import config as cfg
 
 
@@ -48,17 +59,24 @@ async def _data_retention_cleanup():
 async def lifespan(app: FastAPI):
     global _cleanup_task
     # Startup
-    await init_db()
+    asset_manifest.load()  # Fingerprinted JS/CSS names for asset_url()
+    # DB, catalog, templates, prerendered pages, voice index; /ready passes once done
+    warmup.start([templates.env, api_templates.env], pose_pages)
     ws_manager.start_cleanup_task()  # Start room cleanup background task
     _cleanup_task = asyncio.create_task(_data_retention_cleanup())  # Start data retention cleanup
     yield
     # Shutdown
+    await warmup.stop()
+    from yoga_voice import get_voice_generator  # Deferred: pulls in the TTS and audio modules
+    if get_voice_generator.built:
+        get_voice_generator().index.flush()  # Durations of clips generated since the last sidecar write
     if _cleanup_task:
         _cleanup_task.cancel()
         try:
             await _cleanup_task
         except asyncio.CancelledError:
             pass
+    connection_limiter.release_all()  # Return this worker's slots in the shared connection counts
     await close_pool()
 
 
@@ -94,11 +112,29 @@ app.add_middleware(
     max_age=600,  # Cache preflight for 10 minutes
 )
 
-# Health Check
+# Gzip large JSON responses (outermost, so it sees the final headers)
+app.add_middleware(CompressionMiddleware)
+
+# Health Check (liveness: the process is up)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "environment": cfg.ENVIRONMENT}
 
+# Readiness: warm-up finished and the database is reachable
+@app.get("/ready")
+async def readiness_check():
+    ready = warmup.complete and await check_db()
+    return JSONResponse(
+        {"status": "ready" if ready else "starting", "warmup": warmup.status()},
+        status_code=200 if ready else 503
+    )
+
+# Cold-start profile (import/lifespan/singleton timings), development only
+if cfg.ENVIRONMENT == "development":
+    @app.get("/api/dev/startup")
+    async def startup_profile():
+        return JSONResponse(startup_report())
+
 # SEO & Ads files
 @app.get("/robots.txt")
 async def robots():
@@ -114,22 +150,29 @@ async def security_txt():
     return FileResponse("static/.well-known/security.txt", media_type="text/plain")
 
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
+templates.env.globals["image_url"] = image_url
+templates.env.globals["image_srcset"] = image_srcset
+
+# Pages that only depend on their template are rendered once and served with an ETag
+page_cache = RenderedPageCache(templates)
+pose_pages = PosePages(page_cache)
 
 @app.get("/privacy")
 async def privacy_page(request: Request):
-    return templates.TemplateResponse("privacy.html", {"request": request})
+    return page_cache.response(request, "privacy.html")
 
 @app.get("/calibrate")
 async def calibrate_page(request: Request):
-    return templates.TemplateResponse("calibrate.html", {"request": request})
+    return page_cache.response(request, "calibrate.html")
 
 @app.get("/tos")
 async def tos_page(request: Request):
-    return templates.TemplateResponse("tos.html", {"request": request})
+    return page_cache.response(request, "tos.html")
 
 @app.get("/science")
 async def science_page(request: Request):
-    return templates.TemplateResponse("science.html", {"request": request})
+    return page_cache.response(request, "science.html")
 
 @app.get("/app")
 async def app_page(request: Request):
@@ -137,78 +180,55 @@ async def app_page(request: Request):
 
 @app.get("/yoga")
 async def yoga_page(request: Request):
-    return templates.TemplateResponse("yoga.html", {"request": request})
+    return page_cache.response(request, "yoga.html")
 
 
-def _load_poses_data():
-    """Load poses data from JSON file."""
-    import json
-    poses_path = os.path.join("static", "data", "yoga", "poses.json")
+@app.get("/img/{width}/{path:path}")
+async def responsive_image(request: Request, width: int, path: str, v: str = ""):
+    """
+    Resized image variant, negotiated by Accept (WebP when supported).
+    URLs come from the image_url()/image_srcset() template helpers.
+    """
     try:
-        with open(poses_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        if cfg.ENVIRONMENT == "development":
-            print(f"[WARN] Poses data file not found: {poses_path}")
-        return {"poses": []}
-    except json.JSONDecodeError as e:
+        result = await asyncio.to_thread(
+            image_variants.get_variant, path, width, request.headers.get("accept", "")
+        )
+    except (OSError, ImportError) as e:
         if cfg.ENVIRONMENT == "development":
-            print(f"[WARN] Invalid JSON in poses data: {e}")
-        return {"poses": []}
-
-
-def _load_knowledge_base():
-    """Load knowledge base data from JSON file."""
-    import json
-    kb_path = os.path.join("static", "data", "yoga", "knowledge_base.json")
-    try:
-        with open(kb_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"poses": {}}
+            print(f"[IMAGES] Variant failed for {path} @ {width}: {e}")
+        result = None
+    if result is None:
+        return JSONResponse({"detail": "Not found"}, status_code=404)
+
+    variant_path, media_type, digest = result
+    response = FileResponse(variant_path, media_type=media_type, stat_result=os.stat(variant_path))
+    response.headers["Vary"] = "Accept"
+    # Versioned URLs never change; unversioned ones revalidate via ETag
+    response.headers["Cache-Control"] = IMMUTABLE if v == digest else REVALIDATE
+    if request.headers.get("if-none-match") == response.headers.get("etag"):
+        return Response(status_code=304, headers={
+            "ETag": response.headers["etag"],
+            "Vary": "Accept",
+            "Cache-Control": response.headers["Cache-Control"]
+        })
+    return response
 
 
 @app.get("/yoga/poses/{pose_id}")
 async def yoga_pose_detail(request: Request, pose_id: str):
-    """Detailed pose encyclopedia page."""
-    # Load poses data
-    poses_data = _load_poses_data()
-    knowledge_base = _load_knowledge_base()
-
-    # Find the requested pose
-    pose = None
-    for p in poses_data.get("poses", []):
-        if p["id"] == pose_id:
-            pose = p
-            break
+    """Detailed pose encyclopedia page (prerendered, see services/pose_pages.py)."""
+    page = pose_pages.get(pose_id)
 
-    if not pose:
+    if page is None:
         from fastapi.responses import RedirectResponse
         return RedirectResponse(url="/yoga", status_code=302)
 
-    # Get knowledge base entry for this pose
-    knowledge = knowledge_base.get("poses", {}).get(pose_id, None)
-
-    # Get related poses (same category or focus)
-    related_poses = [
-        p for p in poses_data.get("poses", [])
-        if p["id"] != pose_id and (
-            p["category"] == pose["category"] or
-            any(f in pose.get("focus", []) for f in p.get("focus", []))
-        )
-    ][:4]
-
-    return templates.TemplateResponse("yoga_pose_detail.html", {
-        "request": request,
-        "pose": pose,
-        "knowledge": knowledge,
-        "related_poses": related_poses
-    })
+    return page_response(request, page)
 
 @app.get("/yoga/preview")
 async def yoga_preview_page(request: Request):
     """Pre-session flow preview page with educational content."""
-    return templates.TemplateResponse("yoga_flow_preview.html", {"request": request})
+    return page_cache.response(request, "yoga_flow_preview.html")
 
 
 @app.get("/yoga/report")
@@ -277,7 +297,14 @@ async def create_yoga_room(request: Request):
 
 @app.post("/api/yoga/voice-script")
 async def generate_voice_script(request: Request):
-    """Generate voice script with audio URLs for a yoga session."""
+    """
+    Generate voice script with audio URLs for a yoga session.
+
+    Set "compact": true in the request body to receive a deduplicated phrase
+    table with id-referencing script items (see compact_voice_script).
+    """
+    from yoga_voice import generate_session_voice_script, compact_voice_script
+
     try:
         data = await request.json()
 
@@ -290,6 +317,10 @@ async def generate_voice_script(request: Request):
         if cfg.ENVIRONMENT == "development":
             print(f"[VOICE] Generated {len(script)} script items")
 
+        # Opt-in deduplicated payload: phrase table + id references
+        if data.get("compact"):
+            return JSONResponse(compact_voice_script(script))
+
         return JSONResponse({"script": script})
     except Exception as e:
         if cfg.ENVIRONMENT == "development":
@@ -298,14 +329,98 @@ async def generate_voice_script(request: Request):
         return JSONResponse({"error": "Voice generation temporarily unavailable", "script": []}, status_code=500)
 
 
+# Voice clip cache keys are MD5 hex digests (URLs may carry a ?v= voice version)
+VOICE_KEY_PATTERN = re.compile(r'([a-f0-9]{32})\.mp3(?:\?|$)')
+MAX_SPRITE_CUES = 512
+
+
+@app.post("/api/yoga/voice-sprite")
+async def generate_voice_sprite(request: Request):
+    """
+    Bundle a session's voice clips into one cached MP3 sprite.
+
+    Request body:
+    {
+        "audio_urls": ["/static/audio/voice/<hash>.mp3?v=<version>", ...]  // audio_url values from the voice script
+    }
+
+    Returns:
+    {
+        "key": "...",
+        "url": "/static/audio/sprites/<key>.mp3",
+        "size": 123456,
+        "duration_ms": 98765,
+        "cues": {"<hash>": {"byte_offset": 0, "byte_length": 17424, "start_ms": 0, "duration_ms": 2904}, ...}
+    }
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse({"error": "Request body must be a JSON object"}, status_code=400)
+
+    audio_urls = data.get("audio_urls") or []
+    if not isinstance(audio_urls, list) or not all(isinstance(url, str) for url in audio_urls):
+        return JSONResponse({"error": "audio_urls must be a list of strings"}, status_code=400)
+
+    keys = set()
+    for url in audio_urls[:MAX_SPRITE_CUES]:
+        match = VOICE_KEY_PATTERN.search(url)
+        if match:
+            keys.add(match.group(1))
+
+    from yoga_voice import get_sprite_cache
+
+    sprite = await asyncio.to_thread(get_sprite_cache().get_or_build, list(keys))
+    if not sprite:
+        # None cached, or clips in mixed formats: the client plays per-clip URLs
+        return JSONResponse({"error": "No sprite for the requested cues"}, status_code=404)
+
+    return JSONResponse(sprite)
+
+
 @app.get("/api/yoga/voice-test")
 async def test_voice_system():
-    """Diagnostic endpoint to test Edge TTS connectivity."""
+    """Diagnostic endpoint to test TTS backend connectivity."""
+    from yoga_voice import test_tts_connectivity
+
     result = await test_tts_connectivity()
     status_code = 200 if result.get("test_audio_generated") else 500
     return JSONResponse(result, status_code=status_code)
 
 
+# Pose search request bounds
+MAX_SEARCH_QUERY_LENGTH = 100
+MAX_SEARCH_LIMIT = 100
+
+
+@app.get("/api/yoga/poses/search")
+async def search_poses(
+    q: str = "",
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    focus: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 20
+):
+    """
+    Full-text pose search with facets.
+
+    Query params: q (prefix-matched words), category, difficulty, focus,
+    offset, limit (max 100). Returns ranked results plus facet counts.
+    """
+    get_pose_catalog().refresh()
+    return JSONResponse(get_pose_search().search(
+        query=q[:MAX_SEARCH_QUERY_LENGTH],
+        category=category,
+        difficulty=difficulty,
+        focus=focus,
+        offset=max(0, offset),
+        limit=max(1, min(limit, MAX_SEARCH_LIMIT))
+    ))
+
+
 @app.post("/api/yoga/manifest")
 async def generate_session_manifest(request: Request):
     """
@@ -420,7 +535,7 @@ async def yoga_remote_websocket(websocket: WebSocket, code: str):
         await ws_manager.disconnect(websocket, code)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
 # Include routers
 app.include_router(api_router)
@@ -0,0 +1,70 @@
+"""
+HTTP cache policy for hohm.studio
+
+Per-path Cache-Control rules:
+- Content-addressed files (sprite bundles, fingerprinted JS/CSS) and voice
+  clips requested with their voice version (?v=): immutable, cached for a year
+- Other static assets (JS, CSS, images, data): cached but revalidated via ETag/Last-Modified
+- Everything else (API, HTML pages): never stored
+
+Responses that already set Cache-Control keep their own policy.
+"""
+
+import re
+from typing import Dict, List, Pattern, Tuple
+
+
+# Long-lived policy for URLs whose content can never change (name = content hash)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Store but revalidate on every use (StaticFiles answers with 304 when unchanged)
+REVALIDATE = "public, no-cache"
+
+# Dynamic or sensitive content
+NO_STORE = "no-store, no-cache, must-revalidate, max-age=0"
+
+# Voice clips are named by the md5 of their text only and are overwritten in
+# place when the voice settings change, so they're immutable only when the URL
+# carries the synthesizer version (VoiceCacheIndex adds ?v=); plain clip URLs
+# fall through to REVALIDATE
+VERSIONED_RULES: List[Tuple[Pattern, Pattern]] = [
+    (re.compile(r"^/static/audio/voice/(?:[\w-]+/)?[a-f0-9]{32}\.mp3$"), re.compile(r"(?:^|&)v=[a-f0-9]+(?:&|$)")),
+]
+
+# First matching rule wins
+CACHE_RULES: List[Tuple[Pattern, str]] = [
+    # Sprite bundles are named by a hash of their clips' sizes, mtimes and voice version
+    (re.compile(r"^/static/audio/sprites/[a-f0-9]{24}\.mp3$"), IMMUTABLE),
+    # Fingerprinted JS/CSS from scripts/build_assets.py
+    (re.compile(r"^/static/dist/.+\.[a-f0-9]{12}\.\w+$"), IMMUTABLE),
+    (re.compile(r"^/static/"), REVALIDATE),
+]
+
+# Only successful responses are cacheable; errors must not be pinned for a year
+CACHEABLE_STATUSES = {200, 203, 204, 206, 304}
+
+
+def get_cache_control(path: str, status_code: int = 200, query_string: str = "") -> str:
+    """Cache-Control value for a request path (and query string) and response status."""
+    if status_code in CACHEABLE_STATUSES:
+        if query_string:
+            for path_pattern, query_pattern in VERSIONED_RULES:
+                if path_pattern.match(path) and query_pattern.search(query_string):
+                    return IMMUTABLE
+        for pattern, policy in CACHE_RULES:
+            if pattern.match(path):
+                return policy
+    return NO_STORE
+
+
+def cache_headers_for(cache_control: str) -> Dict[str, str]:
+    """Headers for a Cache-Control policy (adds Pragma for HTTP/1.0 caches when not storable)."""
+    headers = {"Cache-Control": cache_control}
+    if cache_control == NO_STORE:
+        headers["Pragma"] = "no-cache"
+    return headers
+
+
+def get_cache_headers(path: str, status_code: int = 200, query_string: str = "") -> Dict[str, str]:
+    """Cache headers for a response."""
+    return cache_headers_for(get_cache_control(path, status_code, query_string))
@@ -0,0 +1,214 @@
+"""
+Response compression for dynamic JSON payloads
+
+Gzips JSON responses above a size threshold when the client accepts gzip.
+Compressed bodies are kept in a small LRU keyed by a digest of the
+uncompressed body, so identical payloads (memoized manifests, repeated
+session exports) are only compressed once.
+
+Static files are skipped - the /static mount serves precompressed variants.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import config as cfg
+from utils.static_files import parse_accept_encoding
+
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ("application/json",)
+
+# Paths handled elsewhere (precompressed static files)
+SKIP_PREFIXES = ("/static/",)
+
+# Larger bodies are streamed through uncompressed rather than held in memory
+MAX_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Bodies above this are compressed in a worker thread (zlib releases the GIL)
+# so a 10,000-log session export doesn't stall the event loop for ~20 ms
+THREAD_OFFLOAD_SIZE = 256 * 1024
+
+
+def accepts_gzip(headers: Headers) -> bool:
+    """True if the request's Accept-Encoding allows gzip (q > 0)."""
+    accepted = parse_accept_encoding(headers.get("accept-encoding", ""))
+    return accepted.get("gzip", accepted.get("*", 0.0)) > 0
+
+
+class CompressedBodyCache:
+    """LRU of gzip bodies keyed by digest of the uncompressed body."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(body: bytes, level: int) -> bytes:
+        return hashlib.blake2b(body, digest_size=16, person=b"gzip-%d" % level).digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+    def put(self, key: bytes, compressed: bytes):
+        if len(compressed) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = compressed
+            self.total_bytes += len(compressed)
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def compress_body(body: bytes, level: int, cache: Optional[CompressedBodyCache] = None) -> bytes:
+    """Gzip a response body, reusing a cached result for identical bodies."""
+    if cache is None:
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    key = cache.key(body, level)
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = gzip.compress(body, compresslevel=level, mtime=0)
+        cache.put(key, compressed)
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI gzip middleware for JSON responses.
+
+    The body is buffered until complete because the size threshold,
+    Content-Length and the body cache key all depend on the whole payload;
+    it's then compressed in one go. Bodies that outgrow the buffer limit,
+    non-JSON responses and responses that already carry a Content-Encoding
+    pass through untouched.
+
+    Every JSON response gets Vary: Accept-Encoding, including the ones left
+    uncompressed (small bodies, clients without gzip), so shared caches
+    never hand one client's encoding to another.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = cfg.COMPRESSION_MIN_SIZE,
+        level: int = cfg.COMPRESSION_LEVEL,
+        cache: Optional[CompressedBodyCache] = None,
+        max_buffer_size: int = MAX_BUFFER_SIZE
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.cache = cache if cache is not None else compressed_body_cache
+        self.max_buffer_size = max_buffer_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        gzip_accepted = accepts_gzip(Headers(scope=scope))
+
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        buffered = 0
+        passthrough = False
+
+        async def flush_uncompressed():
+            nonlocal passthrough
+            passthrough = True
+            await send(start_message)
+            body = b"".join(chunks)
+            chunks.clear()
+            return body
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, buffered, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                compressible = self._is_compressible(message)
+                if compressible:
+                    # The encoding depends on Accept-Encoding even when this response stays identity
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                passthrough = not (compressible and gzip_accepted)
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            buffered += len(chunks[-1])
+            more_body = message.get("more_body", False)
+
+            if more_body:
+                if buffered > self.max_buffer_size:
+                    body = await flush_uncompressed()
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+                return
+
+            if buffered < self.minimum_size:
+                body = await flush_uncompressed()
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            body = b"".join(chunks)
+            chunks.clear()
+            if len(body) > THREAD_OFFLOAD_SIZE:
+                compressed = await asyncio.to_thread(compress_body, body, self.level, self.cache)
+            else:
+                compressed = compress_body(body, self.level, self.cache)
+            headers = MutableHeaders(scope=start_message)
+            headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Body bytes differ from the identity representation
+                headers["ETag"] = f"W/{etag}"
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _is_compressible(start_message: Message) -> bool:
+        """True if the response type is compressible and not already encoded."""
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+
+# Process-wide body cache (inspectable from benchmarks and diagnostics)
+compressed_body_cache = CompressedBodyCache(
+    max_entries=cfg.COMPRESSION_CACHE_ENTRIES,
+    max_bytes=cfg.COMPRESSION_CACHE_MB * 1024 * 1024
+)
@@ -0,0 +1,104 @@
+"""
+Compiled substring matcher for request validation
+
+A set of literal patterns is folded into a trie and emitted as one regular
+expression with shared prefixes factored out, e.g. ["onload=", "onclick=",
+"onerror="] becomes "on(?:load=|click=|error=)". Each input is scanned once,
+and the work per position depends on the length of the matching prefix
+rather than on the number of patterns, so rule sets loaded from a file can
+grow to thousands of entries without a linear slowdown.
+
+Matching is case-insensitive: patterns are lowercased at compile time and
+inputs once per scan.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.debug import debug_log
+
+
+# Marks the end of a pattern inside the trie
+_END = ""
+
+
+def _build_trie(patterns: Iterable[str]) -> Dict:
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[_END] = True
+    return trie
+
+
+def _trie_to_regex(node: Dict) -> str:
+    """Regex for the patterns below a trie node (shortest match is enough to detect a hit)."""
+    if _END in node:
+        # A pattern ends here; longer ones sharing this prefix can't add matches
+        return ""
+
+    single_chars = []
+    branches = []
+    for char in sorted(node):
+        child = _trie_to_regex(node[char])
+        if child:
+            branches.append(re.escape(char) + child)
+        else:
+            single_chars.append(char)
+
+    if single_chars:
+        if len(single_chars) == 1:
+            branches.append(re.escape(single_chars[0]))
+        else:
+            branches.append("[" + "".join(re.escape(c) for c in single_chars) + "]")
+
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional["re.Pattern"]:
+    """Compile literal patterns into one regex, or None if there are none."""
+    unique = {p.lower() for p in patterns if p}
+    if not unique:
+        return None
+    return re.compile(_trie_to_regex(_build_trie(unique)))
+
+
+def load_patterns(path: str) -> List[str]:
+    """
+    Read patterns from a text file: one literal per line, blank lines and
+    lines starting with '#' ignored. A missing file yields no patterns.
+    """
+    if not path:
+        return []
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        debug_log(f"[SECURITY] Pattern file not found: {path}")
+        return []
+    patterns = [line.strip() for line in lines]
+    return [p for p in patterns if p and not p.startswith("#")]
+
+
+class PatternMatcher:
+    """Case-insensitive 'does any pattern occur in this text' check."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted({p.lower() for p in patterns if p})
+        self._regex = compile_patterns(self.patterns)
+
+    def search(self, text: str) -> Optional[str]:
+        """First pattern found in text (lowercased), or None."""
+        if self._regex is None or not text:
+            return None
+        match = self._regex.search(text.lower())
+        return match.group(0) if match else None
+
+    def matches(self, text: str) -> bool:
+        return self.search(text) is not None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
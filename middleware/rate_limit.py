@@ -0,0 +1,320 @@
+"""
+Keyed rate limiting (GCRA token bucket)
+
+One limiter type shared by the HTTP middleware, the /ws message limiter and
+room-code validation. Each key costs a single float - its theoretical arrival
+time (TAT) - so a check is O(1) with no per-request history:
+
+- a bucket holds `burst` requests and refills at `rate` per second
+- a request is allowed while it fits in the bucket; denied ones don't consume
+- optional penalty: a denial blocks the key for `block_seconds`
+
+Limiter state lives in a pluggable store (RATE_LIMIT_BACKEND):
+- "memory" (default): per-process LRU capped at `max_keys`; entries whose
+  bucket has fully refilled (the same as no entry) or whose block has
+  expired are swept periodically, so memory stays flat even under scans
+  from rotating IPs
+- "shared": a fixed-size hash table in a memory-mapped file (under /dev/shm)
+  guarded by an fcntl lock, so every uvicorn worker on the host sees the
+  same counts and limits aren't multiplied by the worker count
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, Hashable, Optional, Tuple
+
+import config as cfg
+from utils.debug import debug_log
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the shared backend falls back to memory
+    fcntl = None
+
+
+# Keys tracked per limiter before the least recently used are evicted
+DEFAULT_MAX_KEYS = 50_000
+
+# Seconds between sweeps for idle (fully refilled) keys
+DEFAULT_SWEEP_INTERVAL = 60.0
+
+# A record is a pair of floats. For buckets: (TAT, blocked until). Stores drop
+# a record once both values are in the past, so other users put an expiry
+# time first, e.g. connection seats are (expires at, pid).
+Record = Tuple[float, float]
+
+
+class MemoryStore:
+    """Per-process record store: an LRU capped at max_keys."""
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._records: "OrderedDict[Hashable, Record]" = OrderedDict()
+
+    def locked(self):
+        # Only ever used from the event loop thread
+        return nullcontext()
+
+    def get(self, key: Hashable) -> Optional[Record]:
+        return self._records.get(key)
+
+    def set(self, key: Hashable, a: float, b: float, evict: bool = True) -> bool:
+        """Store a record. With evict=False a full store refuses new keys (returns False)."""
+        if not evict and key not in self._records and len(self._records) >= self.max_keys:
+            return False
+        self._records[key] = (a, b)
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+        return True
+
+    def delete(self, key: Hashable):
+        self._records.pop(key, None)
+
+    def sweep(self, now: float) -> int:
+        """Drop expired records. Returns the number removed."""
+        expired = [key for key, (a, b) in self._records.items() if a <= now and b <= now]
+        for key in expired:
+            del self._records[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class _FileLock:
+    """Exclusive flock on a file descriptor, as a reusable context manager."""
+
+    __slots__ = ("fd",)
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+class SharedMemoryStore:
+    """
+    Record store shared by all processes on the host.
+
+    Open-addressing hash table in a memory-mapped file: each slot holds a
+    64-bit key hash and a record. A key may sit in any of PROBE_LENGTH slots
+    from its home slot; when all of them are taken the slot with the oldest
+    record is reused, which bounds memory like the LRU in MemoryStore (or,
+    with set(evict=False), the write is refused).
+    Callers hold locked() (an exclusive flock) around read-modify-write.
+    """
+
+    MAGIC = b"HOHMRL01"
+    HEADER = struct.Struct("<8sI")  # magic, slot count
+    SLOT = struct.Struct("<Qdd")  # key hash (0 = empty), record
+    PROBE_LENGTH = 16
+
+    def __init__(self, path: str, slots: int = DEFAULT_MAX_KEYS):
+        if fcntl is None:
+            raise OSError("fcntl is not available on this platform")
+        self.path = path
+        self.slots = slots
+        size = self.HEADER.size + slots * self.SLOT.size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._lock = _FileLock(self._fd)
+        with self._lock:
+            header = os.pread(self._fd, self.HEADER.size, 0)
+            if len(header) < self.HEADER.size or self.HEADER.unpack(header) != (self.MAGIC, slots):
+                # New file, or one written with a different layout: start empty
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, slots), 0)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def locked(self):
+        return self._lock
+
+    @staticmethod
+    def _hash(key: Hashable) -> int:
+        digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _offset(self, index: int) -> int:
+        return self.HEADER.size + (index % self.slots) * self.SLOT.size
+
+    def _find(self, key_hash: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """(offset holding key_hash, first empty offset, offset of the oldest record); None where absent."""
+        home = key_hash % self.slots
+        free = None
+        oldest = None
+        oldest_value = None
+        for i in range(self.PROBE_LENGTH):
+            offset = self._offset(home + i)
+            slot_hash, a, b = self.SLOT.unpack_from(self._mm, offset)
+            if slot_hash == key_hash:
+                return offset, free, oldest
+            if slot_hash == 0:
+                if free is None:
+                    free = offset
+            elif oldest_value is None or max(a, b) < oldest_value:
+                oldest, oldest_value = offset, max(a, b)
+        return None, free, oldest
+
+    def get(self, key: Hashable) -> Optional[Record]:
+        offset, _, _ = self._find(self._hash(key))
+        if offset is None:
+            return None
+        _, a, b = self.SLOT.unpack_from(self._mm, offset)
+        return a, b
+
+    def set(self, key: Hashable, a: float, b: float, evict: bool = True) -> bool:
+        """Store a record. With evict=False a full probe window refuses new keys (returns False)."""
+        key_hash = self._hash(key)
+        offset, free, oldest = self._find(key_hash)
+        if offset is None:
+            offset = free
+        if offset is None:
+            if not evict:
+                return False
+            offset = oldest
+            _, old_a, old_b = self.SLOT.unpack_from(self._mm, offset)
+            if max(old_a, old_b) > time.time():
+                debug_log(f"[RATE LIMIT] {os.path.basename(self.path)} is full, evicting a live record")
+        self.SLOT.pack_into(self._mm, offset, key_hash, a, b)
+        return True
+
+    def delete(self, key: Hashable):
+        offset, _, _ = self._find(self._hash(key))
+        if offset is not None:
+            self.SLOT.pack_into(self._mm, offset, 0, 0.0, 0.0)
+
+    def sweep(self, now: float) -> int:
+        # Expired records are the first to be reused; nothing to do
+        return 0
+
+    def __len__(self) -> int:
+        return sum(
+            1 for index in range(self.slots)
+            if self.SLOT.unpack_from(self._mm, self._offset(index))[0]
+        )
+
+
+def create_store(namespace: str, max_keys: int = DEFAULT_MAX_KEYS):
+    """
+    Record store for one limiter, per RATE_LIMIT_BACKEND.
+    Falls back to a per-process store if shared memory can't be used.
+    """
+    if cfg.RATE_LIMIT_BACKEND == "shared":
+        path = os.path.join(cfg.RATE_LIMIT_SHARED_DIR, f"hohm-ratelimit-{namespace}")
+        try:
+            return SharedMemoryStore(path, slots=max_keys)
+        except OSError as e:
+            debug_log(f"[RATE LIMIT] Shared store unavailable ({e}), using per-process limits for {namespace}")
+    return MemoryStore(max_keys)
+
+
+class TokenBucketLimiter:
+    """Per-key token bucket implemented as a generic cell rate algorithm."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        block_seconds: float = 0.0,
+        store=None,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.time
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.block_seconds = block_seconds
+        self.store = store if store is not None else MemoryStore()
+        self.sweep_interval = sweep_interval
+        # Wall clock, so times mean the same thing in every worker sharing a store
+        self.clock = clock
+
+        # Seconds to refill one request, and how far the TAT may run ahead of now
+        self.interval = 1.0 / rate
+        self.capacity = self.interval * burst
+
+        self._next_sweep = clock() + sweep_interval
+
+    def hit(self, key: Hashable, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Try to consume `cost` requests for key.
+        Returns (allowed, retry_after_seconds); retry_after is 0 when allowed.
+        """
+        now = self.clock()
+        with self.store.locked():
+            if now >= self._next_sweep:
+                self.store.sweep(now)
+                self._next_sweep = now + self.sweep_interval
+
+            tat, blocked_until = self.store.get(key) or (now, 0.0)
+            if blocked_until > now:
+                return False, blocked_until - now
+
+            tat = max(tat, now)
+            new_tat = tat + self.interval * cost
+            excess = new_tat - now - self.capacity
+
+            if excess > 0:
+                if self.block_seconds:
+                    self.store.set(key, tat, now + self.block_seconds)
+                    return False, self.block_seconds
+                return False, excess
+
+            self.store.set(key, new_tat, 0.0)
+            return True, 0.0
+
+    def blocked_for(self, key: Hashable) -> float:
+        """Seconds left on a penalty block for key (0 if not blocked)."""
+        with self.store.locked():
+            record = self.store.get(key)
+        if record is None:
+            return 0.0
+        return max(0.0, record[1] - self.clock())
+
+    def block(self, key: Hashable, seconds: float):
+        """Deny key for at least `seconds`, regardless of its bucket level."""
+        now = self.clock()
+        with self.store.locked():
+            tat, blocked_until = self.store.get(key) or (now, 0.0)
+            self.store.set(key, tat, max(blocked_until, now + seconds))
+
+    def reset(self, key: Hashable):
+        """Forget key (full bucket, no block)."""
+        with self.store.locked():
+            self.store.delete(key)
+
+    def refill(self, key: Hashable):
+        """Restore a full bucket for key, keeping any active block."""
+        now = self.clock()
+        with self.store.locked():
+            record = self.store.get(key)
+            if record is None:
+                return
+            blocked_until = record[1]
+            if blocked_until > now:
+                self.store.set(key, now, blocked_until)
+            else:
+                self.store.delete(key)
+
+    def sweep(self) -> int:
+        """Drop refilled buckets and expired blocks. Returns the number of entries removed."""
+        now = self.clock()
+        with self.store.locked():
+            self._next_sweep = now + self.sweep_interval
+            return self.store.sweep(now)
+
+    def __len__(self) -> int:
+        """Tracked keys (bucket states and active blocks)."""
+        return len(self.store)
@@ -4,21 +4,24 @@ Security middleware for hohm.studio
 Implements:
 - Content Security Policy (CSP) headers
 - Security headers (X-Frame-Options, X-Content-Type-Options, etc.)
+- Path-based cache policy (see cache_policy.py)
 - Rate limiting per IP
 - Request size limits
 - HTTPS enforcement (production)
 - WebSocket origin validation
 """
 
-import time
 import hashlib
-from collections import defaultdict
-from typing import Callable, Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 from fastapi import Request, Response, WebSocket
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import URL, Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import config as cfg
+from middleware.cache_policy import cache_headers_for, get_cache_control
+from middleware.pattern_matcher import PatternMatcher, load_patterns
+from middleware.rate_limit import TokenBucketLimiter, create_store
 from utils.network import get_client_ip
 
 
@@ -26,8 +29,9 @@ from utils.network import get_client_ip
 
 class IPRateLimiter:
     """
-    IP-based rate limiter with sliding window.
-    Tracks requests per IP address and blocks excessive traffic.
+    IP-based rate limiter.
+    Two token buckets per IP: a sustained per-minute rate and a short burst
+    allowance. Exceeding either blocks the IP for block_duration_seconds.
     """
 
     def __init__(
@@ -35,25 +39,27 @@ class IPRateLimiter:
         requests_per_minute: int = 60,
         requests_per_second: int = 10,
         burst_limit: int = 20,
-        block_duration_seconds: int = 60
+        block_duration_seconds: int = 60,
+        namespace: Optional[str] = None
     ):
         self.requests_per_minute = requests_per_minute
         self.requests_per_second = requests_per_second
         self.burst_limit = burst_limit
         self.block_duration = block_duration_seconds
 
-        # Storage: {ip: [(timestamp, count), ...]}
-        self.request_log: Dict[str, list] = defaultdict(list)
-        self.blocked_ips: Dict[str, float] = {}
-        self.burst_tracker: Dict[str, Tuple[float, int]] = {}
-
-    def _clean_old_entries(self, ip: str, now: float):
-        """Remove entries older than 1 minute."""
-        cutoff = now - 60
-        self.request_log[ip] = [
-            (ts, count) for ts, count in self.request_log[ip]
-            if ts > cutoff
-        ]
+        # Named limiters use the configured store (shared across workers if enabled)
+        def store(name: str):
+            return create_store(f"{namespace}-{name}") if namespace else None
+
+        # Up to a minute's worth of requests, refilled at the per-minute rate
+        self.sustained = TokenBucketLimiter(
+            rate=requests_per_minute / 60,
+            burst=requests_per_minute,
+            block_seconds=block_duration_seconds,
+            store=store("sustained")
+        )
+        # Up to burst_limit back-to-back requests, refilled at the per-second rate
+        self.bursts = TokenBucketLimiter(rate=requests_per_second, burst=burst_limit, store=store("burst"))
 
     def is_allowed(self, request: Request) -> Tuple[bool, str]:
         """
@@ -61,51 +67,31 @@ class IPRateLimiter:
         Returns (is_allowed, reason_if_blocked)
         """
         ip = get_client_ip(request)
-        now = time.time()
 
-        # Check if IP is currently blocked
-        if ip in self.blocked_ips:
-            if now < self.blocked_ips[ip]:
-                remaining = int(self.blocked_ips[ip] - now)
-                return False, f"Rate limited. Try again in {remaining} seconds."
-            else:
-                del self.blocked_ips[ip]
+        blocked = self.sustained.blocked_for(ip)
+        if blocked:
+            return False, f"Rate limited. Try again in {int(blocked)} seconds."
 
         # Check burst limit (too many requests in very short time)
-        if ip in self.burst_tracker:
-            last_burst_time, burst_count = self.burst_tracker[ip]
-            if now - last_burst_time < 1.0:  # Within 1 second
-                if burst_count >= self.burst_limit:
-                    self.blocked_ips[ip] = now + self.block_duration
-                    return False, "Too many requests. Please slow down."
-                self.burst_tracker[ip] = (last_burst_time, burst_count + 1)
-            else:
-                self.burst_tracker[ip] = (now, 1)
-        else:
-            self.burst_tracker[ip] = (now, 1)
-
-        # Clean old entries
-        self._clean_old_entries(ip, now)
-
-        # Count requests in last minute
-        total_requests = sum(count for _, count in self.request_log[ip])
-
-        if total_requests >= self.requests_per_minute:
-            self.blocked_ips[ip] = now + self.block_duration
-            return False, "Rate limit exceeded. Please try again later."
+        allowed, _ = self.bursts.hit(ip)
+        if not allowed:
+            self.sustained.block(ip, self.block_duration)
+            return False, "Too many requests. Please slow down."
 
-        # Log this request
-        self.request_log[ip].append((now, 1))
+        allowed, _ = self.sustained.hit(ip)
+        if not allowed:
+            return False, "Rate limit exceeded. Please try again later."
 
         return True, ""
 
 
 # Global rate limiter instance
 rate_limiter = IPRateLimiter(
-    requests_per_minute=120,  # 2 requests/second average
+    requests_per_minute=cfg.RATE_LIMIT_REQUESTS_PER_MINUTE,  # 2 requests/second average by default
     requests_per_second=15,
-    burst_limit=30,
-    block_duration_seconds=60
+    burst_limit=cfg.RATE_LIMIT_BURST,
+    block_duration_seconds=60,
+    namespace="http"
 )
 
 
@@ -195,12 +181,6 @@ def get_security_headers() -> Dict[str, str]:
 
         # Content Security Policy
         "Content-Security-Policy": get_csp_header(),
-
-        # Cache control for dynamic content
-        "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-
-        # Prevent caching of sensitive data
-        "Pragma": "no-cache",
     }
 
     # Add HSTS in production (force HTTPS)
@@ -210,28 +190,62 @@ def get_security_headers() -> Dict[str, str]:
     return headers
 
 
+def encode_headers(headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
+    """Header dict -> ASGI raw header pairs (lowercase names, latin-1 bytes)."""
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
 # === MIDDLEWARE ===
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class SecurityMiddleware:
     """
     Security middleware that adds headers and enforces rate limiting.
+
+    Pure ASGI: the security headers are encoded once at startup and appended
+    to the raw header list in http.response.start, so response bodies stream
+    through untouched. WebSocket and lifespan scopes pass straight through.
     """
 
     # Paths that bypass rate limiting (for static assets)
-    BYPASS_PATHS = {"/static/", "/health", "/yoga/remote", "/ws/yoga/"}
+    BYPASS_PATHS = ("/static/", "/img/", "/health", "/ready", "/yoga/remote", "/ws/yoga/")
+
+    # Load balancer probes, served over plain HTTP inside the platform network
+    PROBE_PATHS = ("/health", "/ready")
 
     # Maximum request body size (1MB - sufficient for JSON requests)
     MAX_BODY_SIZE = 1 * 1024 * 1024
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        path = request.url.path
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.security_headers = encode_headers(get_security_headers())
+        self.security_header_names = {name for name, _ in self.security_headers}
+        # {Cache-Control policy: raw header pairs}, filled on first use
+        self.cache_headers: Dict[str, List[Tuple[bytes, bytes]]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
 
-        # Skip rate limiting for static assets
-        skip_rate_limit = any(path.startswith(p) for p in self.BYPASS_PATHS)
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = self._response_headers(scope, path, message)
+            await send(message)
 
+        rejection = self._check_request(scope, path)
+        if rejection is not None:
+            await rejection(scope, receive, send_wrapper)
+            return
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _check_request(self, scope: Scope, path: str):
+        """Early response for requests that must not reach the app, else None."""
         # Rate limiting for non-static requests
-        if not skip_rate_limit:
-            allowed, reason = rate_limiter.is_allowed(request)
+        if not path.startswith(self.BYPASS_PATHS):
+            allowed, reason = rate_limiter.is_allowed(Request(scope))
             if not allowed:
                 return JSONResponse(
                     status_code=429,
@@ -239,37 +253,56 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                     headers={"Retry-After": "60"}
                 )
 
+        headers = Headers(scope=scope)
+
         # Check content length
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > self.MAX_BODY_SIZE:
-            return JSONResponse(
-                status_code=413,
-                content={"detail": "Request rejected"}
-            )
+        content_length = headers.get("content-length")
+        if content_length:
+            try:
+                too_large = int(content_length) > self.MAX_BODY_SIZE
+            except ValueError:
+                return JSONResponse(status_code=400, content={"detail": "Bad request"})
+            if too_large:
+                return JSONResponse(
+                    status_code=413,
+                    content={"detail": "Request rejected"}
+                )
 
         # HTTPS enforcement in production (skip for localhost/local IPs)
         if cfg.ENVIRONMENT == "production":
-            host = request.headers.get("host", "").split(":")[0]
+            host = headers.get("host", "").split(":")[0]
             is_local = host in ["localhost", "127.0.0.1", "0.0.0.0"]
-            
-            forwarded_proto = request.headers.get("x-forwarded-proto", "http")
-            if forwarded_proto != "https" and path not in ["/health"] and not is_local:
+
+            forwarded_proto = headers.get("x-forwarded-proto", "http")
+            if forwarded_proto != "https" and path not in self.PROBE_PATHS and not is_local:
                 # Redirect to HTTPS
-                https_url = str(request.url).replace("http://", "https://", 1)
+                https_url = str(URL(scope=scope)).replace("http://", "https://", 1)
                 return Response(
                     status_code=301,
                     headers={"Location": https_url}
                 )
 
-        # Process request
-        response = await call_next(request)
+        return None
 
-        # Add security headers to all responses
-        security_headers = get_security_headers()
-        for header, value in security_headers.items():
-            response.headers[header] = value
+    def _response_headers(self, scope: Scope, path: str, message: Message) -> List[Tuple[bytes, bytes]]:
+        """Response headers with the security headers (replacing any set by the endpoint) and cache policy."""
+        headers = [
+            (name, value) for name, value in message.get("headers", [])
+            if name.lower() not in self.security_header_names
+        ]
+        has_cache_control = any(name.lower() == b"cache-control" for name, _ in headers)
+        headers.extend(self.security_headers)
+
+        # Path-based cache policy, unless the endpoint chose its own
+        if not has_cache_control:
+            query_string = scope.get("query_string", b"").decode("latin-1")
+            cache_control = get_cache_control(path, message["status"], query_string)
+            pairs = self.cache_headers.get(cache_control)
+            if pairs is None:
+                pairs = self.cache_headers[cache_control] = encode_headers(cache_headers_for(cache_control))
+            headers.extend(pairs)
 
-        return response
+        return headers
 
 
 # === WEBSOCKET ORIGIN VALIDATION ===
@@ -316,9 +349,10 @@ def validate_websocket_origin(websocket: WebSocket) -> bool:
     return False
 
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """
     Validates incoming requests for common attack patterns.
+    Pure ASGI; only HTTP requests are inspected.
     """
 
     # Suspicious patterns that might indicate attacks
@@ -340,25 +374,39 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
         "UNION SELECT",  # SQL injection
     ]
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Check URL path for suspicious patterns
-        path = request.url.path.lower()
-        query = str(request.url.query).lower()
-
-        for pattern in self.SUSPICIOUS_PATTERNS:
-            if pattern.lower() in path or pattern.lower() in query:
-                return JSONResponse(
-                    status_code=400,
-                    content={"detail": "Bad request"}
-                )
-
-        # Check User-Agent for common attack tools
-        user_agent = request.headers.get("user-agent", "").lower()
-        blocked_agents = ["sqlmap", "nikto", "nessus", "acunetix", "nmap"]
-        if any(agent in user_agent for agent in blocked_agents):
-            return JSONResponse(
+    # User-Agent substrings of common attack tools
+    BLOCKED_AGENTS = ["sqlmap", "nikto", "nessus", "acunetix", "nmap"]
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Built-in rules plus any loaded from file, each compiled into one matcher
+        self.pattern_matcher = PatternMatcher(
+            self.SUSPICIOUS_PATTERNS + load_patterns(cfg.SUSPICIOUS_PATTERNS_FILE)
+        )
+        self.agent_matcher = PatternMatcher(
+            self.BLOCKED_AGENTS + load_patterns(cfg.BLOCKED_AGENTS_FILE)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and not self._is_valid(scope):
+            response = JSONResponse(
                 status_code=400,
                 content={"detail": "Bad request"}
             )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    def _is_valid(self, scope: Scope) -> bool:
+        # Path and query in one scan; patterns never contain a newline, so
+        # no match can span the two
+        query = scope.get("query_string", b"").decode("latin-1")
+        if self.pattern_matcher.matches(scope["path"] + "\n" + query):
+            return False
 
-        return await call_next(request)
+        # Check User-Agent for common attack tools
+        user_agent = Headers(scope=scope).get("user-agent", "")
+        if self.agent_matcher.matches(user_agent):
+            return False
+
+        return True
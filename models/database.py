@@ -1,10 +1,13 @@
+import asyncio
 import asyncpg
 import config as cfg
 import json
 import math
 import traceback
+from datetime import datetime
 from typing import Optional, Any
 from utils.debug import debug_log as _debug_log
+from models.migrations import migrate
 
 # Constants
 MAX_LOGS_PER_SESSION = 10000
@@ -36,6 +39,10 @@ def _validate_session_data(session_data: dict) -> tuple[bool, str]:
     if not session_id or not isinstance(session_id, str) or len(session_id) < 10:
         return False, "Invalid session_id format"
 
+    # Sessions are listed and paginated by start_time
+    if not isinstance(session_data['start_time'], datetime):
+        return False, "Invalid start_time"
+
     # Validate numeric ranges
     duration = session_data.get('duration_minutes', 0)
     if not isinstance(duration, (int, float)) or duration < 0 or duration > 1440:  # Max 24 hours
@@ -103,8 +110,8 @@ async def get_pool() -> asyncpg.Pool:
         # Supabase pooler requires statement_cache_size=0 to disable prepared statements
         _pool = await asyncpg.create_pool(
             cfg.DATABASE_URL,
-            min_size=1,
-            max_size=10,
+            min_size=cfg.DB_POOL_MIN_SIZE,
+            max_size=cfg.DB_POOL_MAX_SIZE,
             command_timeout=30,
             statement_cache_size=0,  # Required for Supabase Session Pooler
             ssl=ssl_context
@@ -113,6 +120,36 @@ async def get_pool() -> asyncpg.Pool:
     return _pool
 
 
+async def warm_pool() -> int:
+    """
+    Open and check the pool's minimum number of connections, so the first
+    requests don't pay for connection setup. Returns the number checked.
+    """
+    pool = await get_pool()
+    connections = [await pool.acquire() for _ in range(pool.get_min_size())]
+    try:
+        await asyncio.gather(*(conn.fetchval('SELECT 1') for conn in connections))
+    finally:
+        for conn in connections:
+            await pool.release(conn)
+    _debug_log(f"[DB] Warmed {len(connections)} pool connections")
+    return len(connections)
+
+
+async def check_db(timeout: float = 2.0) -> bool:
+    """True if the database answers a trivial query within timeout seconds."""
+    async def ping():
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            await conn.fetchval('SELECT 1')
+    try:
+        await asyncio.wait_for(ping(), timeout)
+        return True
+    except Exception as e:
+        _debug_log(f"[DB] Health check failed: {e}")
+        return False
+
+
 async def close_pool():
     """Close the connection pool."""
     global _pool
@@ -122,64 +159,15 @@ async def close_pool():
 
 
 async def init_db():
-    """Initialize database with required tables and indexes."""
+    """Bring the schema up to date (see models/migrations.py). Returns True on success."""
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            # Create sessions table with device_token for user isolation
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    device_token TEXT,
-                    start_time TIMESTAMPTZ,
-                    end_time TIMESTAMPTZ,
-                    duration_minutes REAL,
-                    good_posture_percentage REAL,
-                    average_score REAL,
-                    total_logs INTEGER,
-                    created_at TIMESTAMPTZ DEFAULT NOW()
-                )
-            ''')
-
-            # Add device_token column if it doesn't exist (migration for existing DBs)
-            await conn.execute('''
-                DO $$
-                BEGIN
-                    IF NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns
-                        WHERE table_name = 'sessions' AND column_name = 'device_token'
-                    ) THEN
-                        ALTER TABLE sessions ADD COLUMN device_token TEXT;
-                    END IF;
-                END $$;
-            ''')
-
-            # Create index for device_token lookups
-            await conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_sessions_device_token ON sessions(device_token)
-            ''')
-
-            # Create logs table
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS logs (
-                    id SERIAL PRIMARY KEY,
-                    session_id TEXT REFERENCES sessions(id) ON DELETE CASCADE,
-                    timestamp TIMESTAMPTZ,
-                    status TEXT,
-                    score REAL,
-                    issues JSONB,
-                    metrics JSONB,
-                    created_at TIMESTAMPTZ DEFAULT NOW()
-                )
-            ''')
-
-            # Create index for faster queries by session_id
-            await conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_logs_session_id ON logs(session_id)
-            ''')
-
-            _debug_log("[DB] Database initialized")
-            return True
+            applied = await migrate(conn)
+        for migration in applied:
+            _debug_log(f"[DB] Applied migration {migration.version:03d} {migration.name}")
+        _debug_log("[DB] Database initialized")
+        return True
     except Exception as e:
         _debug_log(f"[DB] Init failed: {e}")
         return False
@@ -204,6 +192,7 @@ async def save_session(session_data: dict, device_token: str = None) -> tuple[bo
     Save session to database with validation.
     Returns (success, error_message).
     device_token: Required for user isolation. Sessions without token are legacy/orphaned.
+    A 'report' (ReportGenerator.build_report) in session_data is saved with the session.
     """
     # Validate data
     is_valid, error = _validate_session_data(session_data)
@@ -226,23 +215,28 @@ async def save_session(session_data: dict, device_token: str = None) -> tuple[bo
         score = _sanitize_number(session_data['average_score'], 0, 10, 0)
         logs = int(_sanitize_number(session_data['total_logs'], 0, MAX_LOGS_PER_SESSION, 0))
 
+        report = session_data.get('report')
+
         pool = await get_pool()
         async with pool.acquire() as conn:
-            result = await conn.execute('''
-                INSERT INTO sessions
-                (id, device_token, start_time, end_time, duration_minutes, good_posture_percentage, average_score, total_logs)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                ON CONFLICT (id) DO NOTHING
-            ''',
-                session_id,
-                device_token,
-                session_data['start_time'],
-                session_data['end_time'],
-                round(duration, 2),
-                round(percentage, 2),
-                round(score, 2),
-                logs
-            )
+            async with conn.transaction():
+                result = await conn.execute('''
+                    INSERT INTO sessions
+                    (id, device_token, start_time, end_time, duration_minutes, good_posture_percentage, average_score, total_logs)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                    ON CONFLICT (id) DO NOTHING
+                ''',
+                    session_id,
+                    device_token,
+                    session_data['start_time'],
+                    session_data['end_time'],
+                    round(duration, 2),
+                    round(percentage, 2),
+                    round(score, 2),
+                    logs
+                )
+                if report:
+                    await _upsert_session_report(conn, session_id, report)
             return True, ""
 
     except asyncpg.UniqueViolationError:
@@ -304,34 +298,46 @@ async def save_log(log_data: dict) -> tuple[bool, str]:
         return False, str(e)
 
 
-async def get_all_sessions(device_token: str = None) -> list[dict]:
+async def get_sessions_page(
+    device_token: str = None,
+    limit: int = 20,
+    after: Optional[tuple[datetime, str]] = None
+) -> tuple[list[dict], bool]:
     """
-    Retrieve sessions for a device, ordered by start time descending.
+    One page of sessions for a device, newest first (keyset pagination).
+    after: (start_time, id) of the last session on the previous page.
+    Returns (sessions, has_more).
     If device_token is provided, only returns sessions for that device.
     """
+    conditions = []
+    params: list = []
+    if device_token:
+        params.append(device_token)
+        conditions.append(f'device_token = ${len(params)}')
+    # Without a token every session is listed (legacy; should not happen in production)
+    if after:
+        # Row comparison follows the (device_token, start_time DESC, id DESC)
+        # index, so every page is an index-only range scan
+        params.extend(after)
+        conditions.append(f'(start_time, id) < (${len(params) - 1}, ${len(params)})')
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    params.append(limit + 1)  # One extra row tells whether another page exists
+
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            if device_token:
-                rows = await conn.fetch('''
-                    SELECT id, start_time, end_time, duration_minutes,
-                           good_posture_percentage, average_score, total_logs
-                    FROM sessions
-                    WHERE device_token = $1
-                    ORDER BY start_time DESC
-                ''', device_token)
-            else:
-                # Legacy: no token filter (should not happen in production)
-                rows = await conn.fetch('''
-                    SELECT id, start_time, end_time, duration_minutes,
-                           good_posture_percentage, average_score, total_logs
-                    FROM sessions
-                    ORDER BY start_time DESC
-                ''')
-            return [dict(row) for row in rows]
+            rows = await conn.fetch(f'''
+                SELECT id, start_time, end_time, duration_minutes,
+                       good_posture_percentage, average_score, total_logs
+                FROM sessions
+                {where}
+                ORDER BY start_time DESC, id DESC
+                LIMIT ${len(params)}
+            ''', *params)
+            return [dict(row) for row in rows[:limit]], len(rows) > limit
     except Exception as e:
         _debug_log(f"[DB] Get sessions failed: {e}")
-        return []
+        return [], False
 
 
 async def get_session(session_id: str, device_token: str = None) -> Optional[dict]:
@@ -400,6 +406,97 @@ async def get_session_logs(session_id: str) -> list[dict]:
         return []
 
 
+async def get_session_issue_counts(session_id: str) -> Optional[dict[str, int]]:
+    """
+    Count issue types across a session's logs, most frequent first.
+    Aggregated in Postgres so reports don't fetch and parse every log row.
+    Returns None if the query fails.
+    """
+    if not session_id or not isinstance(session_id, str):
+        return {}
+
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                '''SELECT issue->>'type' AS issue_type, COUNT(*) AS count
+                   FROM logs,
+                        jsonb_array_elements(
+                            CASE WHEN jsonb_typeof(issues) = 'array' THEN issues ELSE '[]'::jsonb END
+                        ) AS issue
+                   WHERE session_id = $1
+                     AND jsonb_typeof(issue) = 'object'
+                     AND issue->>'type' <> ''
+                   GROUP BY issue_type
+                   ORDER BY count DESC, issue_type COLLATE "C"''',
+                session_id
+            )
+            return {row['issue_type']: row['count'] for row in rows}
+    except Exception as e:
+        _debug_log(f"[DB] Get issue counts failed: {e}")
+        return None
+
+
+async def _upsert_session_report(conn: asyncpg.Connection, session_id: str, report: dict):
+    await conn.execute('''
+        INSERT INTO session_reports
+        (session_id, algorithm_version, issue_counts, common_issues, recommendations)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (session_id) DO UPDATE SET
+            algorithm_version = EXCLUDED.algorithm_version,
+            issue_counts = EXCLUDED.issue_counts,
+            common_issues = EXCLUDED.common_issues,
+            recommendations = EXCLUDED.recommendations,
+            created_at = NOW()
+        -- Never replace a report from a newer algorithm (e.g. during a rolling deploy)
+        WHERE session_reports.algorithm_version <= EXCLUDED.algorithm_version
+    ''',
+        session_id,
+        report['algorithm_version'],
+        json.dumps(report['issue_counts']),
+        json.dumps(report['common_issues']),
+        json.dumps(report['recommendations'])
+    )
+
+
+async def save_session_report(session_id: str, report: dict) -> bool:
+    """Store (or replace) a session's report."""
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            await _upsert_session_report(conn, session_id, report)
+            return True
+    except Exception as e:
+        _debug_log(f"[DB] Save report failed: {e}")
+        return False
+
+
+async def get_session_report(session_id: str) -> Optional[dict]:
+    """Retrieve a session's stored report (None if it has none)."""
+    if not session_id or not isinstance(session_id, str):
+        return None
+
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                '''SELECT algorithm_version, issue_counts, common_issues, recommendations
+                   FROM session_reports WHERE session_id = $1''',
+                session_id
+            )
+            if not row:
+                return None
+            report = dict(row)
+            # Parse JSONB fields back to Python objects
+            for field in ('issue_counts', 'common_issues', 'recommendations'):
+                if isinstance(report[field], str):
+                    report[field] = json.loads(report[field])
+            return report
+    except Exception as e:
+        _debug_log(f"[DB] Get report failed: {e}")
+        return None
+
+
 async def delete_session(session_id: str, device_token: str = None) -> bool:
     """
     Delete a session and its logs.
@@ -0,0 +1,186 @@
+"""
+Versioned schema migrations
+
+Migrations are numbered SQL scripts applied in order. The highest applied
+number is kept in the schema_version table, so on a current database a
+startup costs a single query. Pending migrations are applied under an
+advisory lock, so concurrent workers (or a deploy step racing a booting
+instance) never apply the same migration twice. Each migration runs in its
+own transaction together with its schema_version row.
+
+Migrations that can't run in a transaction (CREATE INDEX CONCURRENTLY, which
+doesn't block writes to a live table) set transactional=False: their
+statements run one at a time and the version is recorded after the last one.
+Write them so a rerun after an interruption is safe.
+
+Add a migration by appending to MIGRATIONS with the next number. Never edit
+or renumber one that has shipped.
+
+Run before a rollout with:
+    python -m models.migrations            # apply pending migrations
+    python -m models.migrations --status   # show current/latest version
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List, NamedTuple
+
+import asyncpg
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+    # False: run each ;-separated statement on its own, outside a transaction
+    transactional: bool = True
+
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every process running migrations
+MIGRATION_LOCK_ID = 0x686F686D  # "hohm"
+
+MIGRATIONS: List[Migration] = [
+    # Baseline: the schema init_db used to create on every boot. Idempotent,
+    # so databases created before migrations existed are adopted as-is.
+    Migration(1, "initial schema", '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            device_token TEXT,
+            start_time TIMESTAMPTZ,
+            end_time TIMESTAMPTZ,
+            duration_minutes REAL,
+            good_posture_percentage REAL,
+            average_score REAL,
+            total_logs INTEGER,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        ALTER TABLE sessions ADD COLUMN IF NOT EXISTS device_token TEXT;
+        CREATE INDEX IF NOT EXISTS idx_sessions_device_token ON sessions(device_token);
+
+        CREATE TABLE IF NOT EXISTS logs (
+            id SERIAL PRIMARY KEY,
+            session_id TEXT REFERENCES sessions(id) ON DELETE CASCADE,
+            timestamp TIMESTAMPTZ,
+            status TEXT,
+            score REAL,
+            issues JSONB,
+            metrics JSONB,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_logs_session_id ON logs(session_id);
+    '''),
+    # Keyset pagination of a device's sessions (newest first) as an index-only
+    # scan: the key matches ORDER BY start_time DESC, id DESC and the listed
+    # columns are included. Supersedes the device_token-only index. Built
+    # concurrently so writes to sessions aren't blocked; the leading DROP
+    # clears an INVALID index left by an interrupted build.
+    Migration(2, "session listing index", '''
+        DROP INDEX CONCURRENTLY IF EXISTS idx_sessions_device_start;
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_device_start
+            ON sessions (device_token, start_time DESC, id DESC)
+            INCLUDE (end_time, duration_minutes, good_posture_percentage, average_score, total_logs);
+        DROP INDEX CONCURRENTLY IF EXISTS idx_sessions_device_token;
+    ''', transactional=False),
+    # Report computed when a session stops and served as-is; rows written by an
+    # older report algorithm_version are recomputed on read.
+    Migration(3, "session reports", '''
+        CREATE TABLE IF NOT EXISTS session_reports (
+            session_id TEXT PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+            algorithm_version INTEGER NOT NULL,
+            issue_counts JSONB NOT NULL,
+            common_issues JSONB NOT NULL,
+            recommendations JSONB NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+    '''),
+    # Keyset pagination orders and compares on (start_time, id); a NULL
+    # start_time would fail cursor encoding and drop out of row comparisons.
+    # Legacy rows without one fall back to when they were created.
+    Migration(4, "session start_time not null", '''
+        UPDATE sessions SET start_time = COALESCE(created_at, NOW()) WHERE start_time IS NULL;
+        ALTER TABLE sessions ALTER COLUMN start_time SET NOT NULL;
+    '''),
+]
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
+
+
+async def current_version(conn: asyncpg.Connection) -> int:
+    """Highest applied migration (0 if migrations have never run)."""
+    try:
+        return await conn.fetchval('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+    except asyncpg.exceptions.UndefinedTableError:
+        return 0
+
+
+def _statements(sql: str) -> List[str]:
+    """Split a non-transactional migration into its statements."""
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+async def _record(conn: asyncpg.Connection, migration: Migration):
+    await conn.execute(
+        'INSERT INTO schema_version (version, name) VALUES ($1, $2)',
+        migration.version, migration.name
+    )
+
+
+async def migrate(conn: asyncpg.Connection) -> List[Migration]:
+    """Apply pending migrations. Returns the ones applied (usually none)."""
+    # Happy path: one query
+    if await current_version(conn) >= LATEST_VERSION:
+        return []
+
+    # Session-level lock: non-transactional migrations run outside any transaction
+    await conn.execute('SELECT pg_advisory_lock($1)', MIGRATION_LOCK_ID)
+    try:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        ''')
+        # Re-read under the lock: another process may have just migrated
+        version = await current_version(conn)
+        applied = []
+        for migration in (m for m in MIGRATIONS if m.version > version):
+            if migration.transactional:
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await _record(conn, migration)
+            else:
+                # One statement per call: a multi-statement string runs as an implicit transaction
+                for statement in _statements(migration.sql):
+                    await conn.execute(statement)
+                await _record(conn, migration)
+            applied.append(migration)
+        return applied
+    finally:
+        await conn.execute('SELECT pg_advisory_unlock($1)', MIGRATION_LOCK_ID)
+
+
+async def _main(args) -> int:
+    from models.database import get_pool, close_pool
+
+    pool = await get_pool()
+    try:
+        async with pool.acquire() as conn:
+            if args.status:
+                version = await current_version(conn)
+                print(f"Schema version {version} (latest {LATEST_VERSION})")
+                return 0 if version >= LATEST_VERSION else 1
+            applied = await migrate(conn)
+            for migration in applied:
+                print(f"Applied {migration.version:03d} {migration.name}")
+            print(f"Schema is at version {LATEST_VERSION}" if applied else "Schema is up to date")
+            return 0
+    finally:
+        await close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show the schema version without migrating (exit 1 if behind)")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark gzip CPU cost vs bytes saved for typical JSON payloads.
+
+Payloads mirror the app's largest dynamic responses:
+- /api/yoga/manifest (generated session manifests)
+- /api/yoga/voice-script (full and compact formats)
+- /api/sessions/{id} (session with up to 10,000 logs)
+
+For each gzip level the report shows compressed size, savings and time per
+response, plus the cost of a compressed-body cache hit (digest only).
+Use it to pick COMPRESSION_LEVEL and COMPRESSION_MIN_SIZE.
+
+Usage:
+    python scripts/benchmark_compression.py
+    python scripts/benchmark_compression.py --levels 1 6 9 --logs 10000
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The app's config requires a database URL at import time; nothing here connects
+os.environ.setdefault("DATABASE_URL", "postgresql://benchmark@localhost/benchmark")
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from middleware.compression import CompressedBodyCache, compress_body  # noqa: E402
+from services.session_manifest import generate_manifest  # noqa: E402
+from yoga_voice import YogaScriptGenerator, compact_voice_script  # noqa: E402
+
+
+def render(content) -> bytes:
+    """Serialize exactly as the endpoints do."""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def manifest_payload(duration: int) -> bytes:
+    manifest = generate_manifest(duration_mins=duration, focus="all", difficulty="beginner")
+    return render({"manifest": manifest, "valid": True, "errors": []})
+
+
+def voice_script_payloads() -> tuple:
+    session = {
+        "duration": 30,
+        "focus": "all",
+        "style": "vinyasa",
+        "breathCues": True,
+        "poses": [
+            {"id": "veerabhadrasana", "name": "Warrior", "duration_seconds": [45],
+             "instructions": ["Step one foot back into a lunge", "Bend your front knee over your ankle"]},
+            {"id": "vrukshasana", "name": "Tree", "duration_seconds": [45], "side": "left",
+             "instructions": ["Stand on one leg", "Place your other foot on your inner thigh or calf"]},
+            {"id": "vrukshasana", "name": "Tree", "duration_seconds": [45], "side": "right",
+             "instructions": ["Stand on one leg", "Place your other foot on your inner thigh or calf"]},
+            {"id": "triangle", "name": "Triangle", "duration_seconds": [60],
+             "instructions": ["Stand with feet wide apart", "Turn one foot out 90 degrees"]},
+            {"id": "baddhakonasana", "name": "Butterfly", "duration_seconds": [60], "phase": "cooldown",
+             "instructions": ["Sit with the soles of your feet together"]},
+        ] * 2,
+    }
+    script = YogaScriptGenerator.generate_session_script(session)
+    for item in script:
+        key = hashlib.md5(item.get("text", "").encode()).hexdigest()
+        item["audio_url"] = f"/static/audio/voice/{key}.mp3"
+        item["duration_ms"] = 1000 + len(item.get("text", "")) * 60
+    return render({"script": script}), render(compact_voice_script(script))
+
+
+def session_payload(log_count: int) -> bytes:
+    rng = random.Random(7)
+    session_id = str(uuid.uuid4())
+    start = datetime(2026, 1, 1, 9, 0, 0)
+    issue_pool = [
+        {"type": "forward_head", "severity": "medium", "advice": "Pull your chin back to align your ears over your shoulders."},
+        {"type": "slouching", "severity": "high", "advice": "Sit up straight and engage your core."},
+        {"type": "shoulder_asymmetry", "severity": "low", "advice": "Level your shoulders and relax them down."},
+    ]
+    logs = []
+    for i in range(log_count):
+        score = round(rng.uniform(3, 10), 2)
+        status = "good" if score >= 7 else "warning" if score >= 5 else "bad"
+        logs.append({
+            "id": i + 1,
+            "session_id": session_id,
+            "timestamp": start + timedelta(seconds=2 * i),
+            "status": status,
+            "score": score,
+            "issues": rng.sample(issue_pool, rng.randint(0, 2)) if status != "good" else [],
+            "metrics": {},
+        })
+    return render({
+        "session": {
+            "id": session_id, "start_time": start, "end_time": start + timedelta(seconds=2 * log_count),
+            "duration_minutes": log_count * 2 / 60, "good_posture_percentage": 61.5,
+            "average_score": 7.1, "total_logs": log_count,
+        },
+        "logs": logs,
+        "common_issues": [],
+        "recommendations": [],
+    })
+
+
+def time_per_call(fn, min_seconds: float = 0.2) -> float:
+    """Mean seconds per call, repeating until min_seconds have elapsed."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main(args):
+    full_script, compact_script = voice_script_payloads()
+    payloads = [
+        ("manifest 15min", manifest_payload(15)),
+        ("manifest 45min", manifest_payload(45)),
+        ("voice-script full", full_script),
+        ("voice-script compact", compact_script),
+        (f"session {args.logs // 10} logs", session_payload(args.logs // 10)),
+        (f"session {args.logs} logs", session_payload(args.logs)),
+    ]
+
+    print("=" * 78)
+    print("JSON RESPONSE COMPRESSION BENCHMARK (gzip)")
+    print("=" * 78)
+    print(f"{'payload':<24} {'level':>5} {'bytes':>10} {'gzip':>9} {'saved':>6} {'ms':>8} {'MB/s':>7}")
+    print("-" * 78)
+
+    for name, body in payloads:
+        for level in args.levels:
+            compressed = compress_body(body, level)
+            seconds = time_per_call(lambda: compress_body(body, level))
+            saved = 100 * (1 - len(compressed) / len(body))
+            print(f"{name:<24} {level:>5} {len(body):>10} {len(compressed):>9} {saved:>5.0f}% "
+                  f"{seconds * 1000:>8.3f} {len(body) / seconds / 1e6:>7.1f}")
+
+        cache = CompressedBodyCache()
+        compress_body(body, args.levels[-1], cache)
+        hit = time_per_call(lambda: compress_body(body, args.levels[-1], cache))
+        print(f"{'':<24} {'hit':>5} {'':>10} {'':>9} {'':>6} {hit * 1000:>8.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON response compression")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9],
+                        help="gzip levels to compare (default: 1 6 9)")
+    parser.add_argument("--logs", type=int, default=10000,
+                        help="Log entries in the largest session payload (default: 10000)")
+    main(parser.parse_args())
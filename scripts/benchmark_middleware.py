@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the security middleware stack.
+
+Calls the ASGI app in-process (no server or sockets), so the numbers reflect
+middleware overhead only. Compares a bare Starlette app against the same app
+wrapped in SecurityMiddleware + RequestValidationMiddleware, for a small JSON
+response and a chunked streaming response. With --baseline it also measures
+the previous BaseHTTPMiddleware implementation of the two middlewares, kept
+below, and reports the speedup over it.
+
+Each simulated client sends its body, reads the whole response and then
+disconnects; every response is checked to have completed.
+
+Usage:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --baseline --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The app's config requires a database URL at import time; nothing here connects
+os.environ.setdefault("DATABASE_URL", "postgresql://benchmark@localhost/benchmark")
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse, Response, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+import config as cfg  # noqa: E402
+import middleware.security as security  # noqa: E402
+from middleware.cache_policy import get_cache_headers  # noqa: E402
+
+
+async def json_endpoint(request):
+    return JSONResponse({"status": "ok", "items": list(range(20))})
+
+
+async def stream_endpoint(request):
+    async def chunks():
+        for _ in range(16):
+            yield b"x" * 1024
+    return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+
+ROUTES = [
+    Route("/api/bench", json_endpoint),
+    Route("/api/stream", stream_endpoint),
+]
+
+
+class AllowAll:
+    """Rate limiter stand-in that admits every request."""
+
+    def is_allowed(self, request):
+        return True, ""
+
+
+# === BASELINE: the BaseHTTPMiddleware implementation before the pure ASGI rewrite ===
+
+class BaselineSecurityMiddleware(BaseHTTPMiddleware):
+    BYPASS_PATHS = {"/static/", "/img/", "/health", "/yoga/remote", "/ws/yoga/"}
+    MAX_BODY_SIZE = 1 * 1024 * 1024
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+
+        skip_rate_limit = any(path.startswith(p) for p in self.BYPASS_PATHS)
+        if not skip_rate_limit:
+            allowed, reason = security.rate_limiter.is_allowed(request)
+            if not allowed:
+                return JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests"},
+                    headers={"Retry-After": "60"}
+                )
+
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > self.MAX_BODY_SIZE:
+            return JSONResponse(status_code=413, content={"detail": "Request rejected"})
+
+        if cfg.ENVIRONMENT == "production":
+            host = request.headers.get("host", "").split(":")[0]
+            is_local = host in ["localhost", "127.0.0.1", "0.0.0.0"]
+            forwarded_proto = request.headers.get("x-forwarded-proto", "http")
+            if forwarded_proto != "https" and path not in ["/health"] and not is_local:
+                https_url = str(request.url).replace("http://", "https://", 1)
+                return Response(status_code=301, headers={"Location": https_url})
+
+        response = await call_next(request)
+
+        for header, value in security.get_security_headers().items():
+            response.headers[header] = value
+
+        if "cache-control" not in response.headers:
+            for header, value in get_cache_headers(path, response.status_code).items():
+                response.headers[header] = value
+
+        return response
+
+
+class BaselineRequestValidationMiddleware(BaseHTTPMiddleware):
+    SUSPICIOUS_PATTERNS = [
+        "<script", "javascript:", "onerror=", "onclick=", "onload=", "eval(",
+        "document.cookie", "window.location", "../", "..\\", "%2e%2e",
+        "' OR ", "\" OR ", "; DROP ", "UNION SELECT",
+    ]
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path.lower()
+        query = str(request.url.query).lower()
+
+        for pattern in self.SUSPICIOUS_PATTERNS:
+            if pattern.lower() in path or pattern.lower() in query:
+                return JSONResponse(status_code=400, content={"detail": "Bad request"})
+
+        user_agent = request.headers.get("user-agent", "").lower()
+        blocked_agents = ["sqlmap", "nikto", "nessus", "acunetix", "nmap"]
+        if any(agent in user_agent for agent in blocked_agents):
+            return JSONResponse(status_code=400, content={"detail": "Bad request"})
+
+        return await call_next(request)
+
+
+# Middleware stacks, in the same order as main.py (security wraps validation)
+STACKS = {
+    "bare": [],
+    "baseline": [
+        Middleware(BaselineSecurityMiddleware),
+        Middleware(BaselineRequestValidationMiddleware),
+    ],
+    "asgi": [
+        Middleware(security.SecurityMiddleware),
+        Middleware(security.RequestValidationMiddleware),
+    ],
+}
+
+
+def build_app(stack: str) -> Starlette:
+    return Starlette(routes=ROUTES, middleware=STACKS[stack])
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"focus=balance&limit=20",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36"),
+            (b"accept", b"application/json"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+
+class Client:
+    """
+    One request's client side: sends the (empty) body, then waits until the
+    response has been sent in full and disconnects, as a browser would.
+    """
+
+    __slots__ = ("body_sent", "done", "complete")
+
+    def __init__(self):
+        self.body_sent = False
+        self.done = asyncio.Event()
+        self.complete = False
+
+    async def receive(self):
+        if not self.body_sent:
+            self.body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            self.complete = True
+            self.done.set()
+
+
+async def request(app, scope: dict):
+    client = Client()
+    await app(dict(scope), client.receive, client.send)
+    if not client.complete:
+        raise RuntimeError(f"{scope['path']}: response did not complete")
+
+
+async def run(app, path: str, requests: int) -> float:
+    """Send requests sequentially; returns requests per second."""
+    scope = make_scope(path)
+    # Warm up (builds the middleware stack, primes caches)
+    for _ in range(100):
+        await request(app, scope)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request(app, scope)
+    return requests / (time.perf_counter() - start)
+
+
+async def main(args):
+    # Measure the middleware plumbing, not the limiter: a real limiter would
+    # block (or accumulate history for) thousands of requests from one IP
+    security.rate_limiter = AllowAll()
+
+    stacks = ["bare", "baseline", "asgi"] if args.baseline else ["bare", "asgi"]
+    width = 16 + 14 * len(stacks) + 12
+
+    print("=" * width)
+    print(f"SECURITY MIDDLEWARE BENCHMARK ({args.requests} requests each, req/s)")
+    print("=" * width)
+    header = f"{'endpoint':<14}" + "".join(f"{name:>14}" for name in stacks) + f"{'overhead':>12}"
+    if args.baseline:
+        header += f"{'speedup':>10}"
+    print(header)
+    print("-" * width)
+
+    for label, path in (("json", "/api/bench"), ("streaming", "/api/stream")):
+        rates = {stack: await run(build_app(stack), path, args.requests) for stack in stacks}
+        overhead_us = (1 / rates["asgi"] - 1 / rates["bare"]) * 1e6
+        line = f"{label:<14}" + "".join(f"{rates[stack]:>14.0f}" for stack in stacks) + f"{overhead_us:>10.1f}us"
+        if args.baseline:
+            line += f"{rates['asgi'] / rates['baseline']:>9.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the security middleware stack")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per measurement (default: 5000)")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also measure the previous BaseHTTPMiddleware implementation")
+    asyncio.run(main(parser.parse_args()))
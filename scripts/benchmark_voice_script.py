@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end voice script generation (script assembly + audio cache).
+
+Uses the offline silent synthesizer so no network access is needed. A cold
+run starts from an empty cache directory and synthesizes every phrase; a warm
+run reuses the directory populated by the previous run.
+
+Usage:
+    python scripts/benchmark_voice_script.py
+    python scripts/benchmark_voice_script.py --sessions 50 --poses 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The app's config requires a database URL at import time; nothing here connects
+os.environ.setdefault("DATABASE_URL", "postgresql://benchmark@localhost/benchmark")
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+import yoga_voice  # noqa: E402
+from voice_synth import get_synthesizer  # noqa: E402
+
+POSES_FILE = ROOT / "static" / "data" / "yoga" / "poses.json"
+
+
+def build_sessions(count: int, pose_count: int, seed: int):
+    """Build deterministic session payloads shaped like the client's request."""
+    with open(POSES_FILE, encoding="utf-8") as f:
+        poses = json.load(f)["poses"]
+
+    rng = random.Random(seed)
+    sessions = []
+    for _ in range(count):
+        picked = rng.sample(poses, min(pose_count, len(poses)))
+        sessions.append({
+            "duration": rng.choice([10, 15, 20, 30]),
+            "focus": rng.choice(["all", "balance", "flexibility", "strength", "relaxation"]),
+            "style": rng.choice(["vinyasa", "hatha"]),
+            "breathCues": True,
+            "poses": [
+                {
+                    "id": p["id"],
+                    "name": p.get("name", p["id"]),
+                    "duration_seconds": p.get("duration_seconds", [30]),
+                    "instructions": p.get("instructions", []),
+                    "phase": "cooldown" if i == len(picked) - 1 else "main",
+                }
+                for i, p in enumerate(picked)
+            ],
+        })
+    return sessions
+
+
+async def run_pass(sessions, seed: int):
+    """Generate every session's voice script. Returns (seconds, script items)."""
+    # Same seed per pass so cold and warm runs request identical phrases
+    random.seed(seed)
+    items = 0
+    start = time.perf_counter()
+    for session in sessions:
+        script = await yoga_voice.generate_session_voice_script(session)
+        items += len(script)
+    return time.perf_counter() - start, items
+
+
+def report(label: str, seconds: float, sessions: int, items: int):
+    print(f"  {label:<6} {seconds * 1000:9.1f} ms   "
+          f"{sessions / seconds:8.1f} sessions/s   {items / seconds:9.1f} items/s")
+
+
+async def main(args):
+    sessions = build_sessions(args.sessions, args.poses, args.seed)
+    synthesizer = get_synthesizer(args.backend)
+
+    print("=" * 60)
+    print(f"Voice script benchmark: {args.sessions} sessions x {args.poses} poses, "
+          f"backend={args.backend}")
+    print("=" * 60)
+
+    for run in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="voice-bench-") as tmp:
+            yoga_voice.get_voice_generator.set(yoga_voice.YogaVoiceGenerator(Path(tmp), synthesizer))
+
+            cold, items = await run_pass(sessions, args.seed)
+            clips = len(yoga_voice.get_voice_generator().index)
+            warm, _ = await run_pass(sessions, args.seed)
+
+        print(f"Run {run + 1}: {items} items, {clips} clips synthesized")
+        report("cold", cold, len(sessions), items)
+        report("warm", warm, len(sessions), items)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark voice script generation")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per pass (default: 20)")
+    parser.add_argument("--poses", type=int, default=6, help="Poses per session (default: 6)")
+    parser.add_argument("--runs", type=int, default=3, help="Cold/warm run pairs (default: 3)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--backend", default="silent",
+                        help="TTS backend (default: silent; 'edge' needs network access)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Build content-hashed copies of the JS and CSS assets, then precompress text assets.
+
+Each file under static/js and static/css is copied to static/dist with a hash
+of its contents in the name (js/yoga-session.js -> js/yoga-session.<hash>.js),
+and static/dist/manifest.json maps original paths to hashed ones. The app's
+asset_url() template helper reads the manifest, so the hashed files can be
+cached forever while every deploy gets fresh URLs.
+
+Compressible files (JS, CSS, JSON, SVG, text) also get .gz siblings, plus .br
+when the brotli package is installed, which the /static mount serves based on
+Accept-Encoding.
+
+Raster images under static/images get resized WebP/JPEG variants in
+static/dist/img (see image_variants.py) so the first visitor doesn't pay for
+generating them. Skipped when Pillow isn't installed.
+
+Run as part of the deploy build (see Dockerfile). Without a build the app
+falls back to the unhashed, uncompressed files.
+
+Usage:
+    python scripts/build_assets.py
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+STATIC_DIR = ROOT / "static"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+
+# Asset directories (relative to static/) and the extensions to fingerprint
+ASSET_DIRS = {
+    "js": (".js",),
+    "css": (".css",),
+}
+
+HASH_LENGTH = 12
+
+# Text formats worth precompressing (audio and raster images are already compressed);
+# utils/static_files.py sends Vary: Accept-Encoding for the same list
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".json", ".svg", ".txt", ".html", ".map"}
+
+# Skip tiny files and variants that don't save enough to be worth a separate file
+MIN_COMPRESS_SIZE = 512
+MAX_COMPRESSED_RATIO = 0.9
+
+# Suffix per content coding (must match PrecompressedStaticFiles)
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def content_hash(data: bytes) -> str:
+    """Short content hash used in fingerprinted file names."""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(rel_path: str, digest: str) -> str:
+    """js/app.js -> js/app.<digest>.js"""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest}{ext}"
+
+
+def build() -> dict:
+    """Write fingerprinted copies and the manifest. Returns the manifest mapping."""
+    assets = {}
+
+    for asset_dir, extensions in ASSET_DIRS.items():
+        source_dir = STATIC_DIR / asset_dir
+        if not source_dir.is_dir():
+            continue
+        for path in sorted(source_dir.rglob("*")):
+            if not path.is_file() or path.suffix not in extensions:
+                continue
+            rel_path = path.relative_to(STATIC_DIR).as_posix()
+            target = hashed_name(rel_path, content_hash(path.read_bytes()))
+
+            target_path = DIST_DIR / target
+            if not target_path.exists():
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, target_path)
+            assets[rel_path] = f"dist/{target}"
+
+    remove_stale(assets)
+
+    manifest = {"assets": assets}
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+    return assets
+
+
+def remove_stale(assets: dict):
+    """Delete fingerprinted files left over from earlier builds."""
+    current = {DIST_DIR / target[len("dist/"):] for target in assets.values()}
+    for asset_dir in ASSET_DIRS:
+        dist_dir = DIST_DIR / asset_dir
+        if not dist_dir.is_dir():
+            continue
+        for path in dist_dir.rglob("*"):
+            if path.is_file() and path not in current:
+                path.unlink()
+
+
+def compress_data(data: bytes, encoding: str) -> bytes:
+    """Compress with maximum effort (done once at build time)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # mtime=0 keeps the output deterministic across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress() -> dict:
+    """
+    Write .gz/.br siblings for compressible static files.
+    Returns {path: {encoding: compressed_size}} for the files compressed.
+    """
+    encodings = ["gzip"] + (["br"] if brotli else [])
+    results = {}
+
+    for path in sorted(STATIC_DIR.rglob("*")):
+        if not path.is_file():
+            continue
+        if path.suffix in ENCODING_SUFFIXES.values():
+            # Drop variants whose source file is gone
+            if not path.with_suffix("").exists():
+                path.unlink()
+            continue
+        if path.suffix not in COMPRESSIBLE_EXTENSIONS:
+            continue
+
+        data = path.read_bytes()
+        for encoding in encodings:
+            variant = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+            compressed = compress_data(data, encoding) if len(data) >= MIN_COMPRESS_SIZE else None
+            if compressed is None or len(compressed) > len(data) * MAX_COMPRESSED_RATIO:
+                variant.unlink(missing_ok=True)
+                continue
+            variant.write_bytes(compressed)
+            # Match the source mtime so the server can tell the variant is current
+            st = path.stat()
+            os.utime(variant, ns=(st.st_atime_ns, st.st_mtime_ns))
+            results.setdefault(path.relative_to(STATIC_DIR).as_posix(), {})[encoding] = len(compressed)
+
+    return results
+
+
+def main():
+    print("=" * 60)
+    print("STATIC ASSET BUILD")
+    print("=" * 60)
+
+    assets = build()
+    for source, target in sorted(assets.items()):
+        print(f"  {source:<32} -> {target}")
+
+    print("-" * 60)
+    print(f"{len(assets)} assets fingerprinted")
+    print(f"Manifest written to: {MANIFEST_PATH}")
+    print()
+
+    if brotli is None:
+        print("brotli not installed - writing gzip variants only (pip install brotli)")
+    compressed = precompress()
+    original_total = 0
+    compressed_total = 0
+    for rel_path, sizes in compressed.items():
+        original = (STATIC_DIR / rel_path).stat().st_size
+        best = min(sizes.values())
+        original_total += original
+        compressed_total += best
+        print(f"  {rel_path:<48} {original:>8} -> {best:>7} ({', '.join(sorted(sizes))})")
+
+    print("-" * 60)
+    saved = 100 * (1 - compressed_total / original_total) if original_total else 0
+    print(f"{len(compressed)} files precompressed: {original_total} -> {compressed_total} bytes ({saved:.0f}% smaller)")
+    print()
+
+    if importlib.util.find_spec("PIL") is None:
+        print("Pillow not installed - skipping responsive image variants")
+        return
+    from image_variants import ImageVariantCache
+    variants = ImageVariantCache(static_dir=STATIC_DIR, variant_dir=DIST_DIR / "img")
+    count = variants.build_all()
+    print(f"{count} responsive image variants ready in {variants.variant_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,29 +5,46 @@ Pre-generate all yoga voice audio files using Edge TTS.
 Run this locally to generate all audio files, then deploy them with the app.
 This avoids runtime TTS generation which may be blocked in cloud environments.
 
+Generation runs with bounded concurrency and adaptive pacing, journals
+progress so an interrupted run resumes where it stopped, and regenerates
+everything when the voice settings change.
+
 Usage:
     python scripts/pregenerate_voice_audio.py
+    python scripts/pregenerate_voice_audio.py --concurrency 16
+    python scripts/pregenerate_voice_audio.py --gc            # also delete orphaned clips
+    python scripts/pregenerate_voice_audio.py --gc --dry-run  # list orphans only
+    python scripts/pregenerate_voice_audio.py --force         # regenerate everything
+    python scripts/pregenerate_voice_audio.py --backend silent   # offline stand-in
 """
 
+import argparse
 import asyncio
 import hashlib
 import json
+import os
+import shutil
 import sys
+import time
 from pathlib import Path
 
-try:
-    import edge_tts
-except ImportError:
-    print("edge-tts not installed. Run: pip install edge-tts")
-    sys.exit(1)
+# Allow importing app modules when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from voice_synth import Synthesizer, get_synthesizer, voice_subdir, SYNTHESIZERS
+
+# Voice cache root; clips go to voice_subdir(synthesizer) below it (same as yoga_voice.py)
+VOICE_ROOT = Path(__file__).parent.parent / "static" / "audio" / "voice"
 
-# Voice configuration (same as yoga_voice.py)
-VOICE = "en-IN-NeerjaNeural"
-VOICE_RATE = "-10%"
-VOICE_PITCH = "-5Hz"
+# Sprite bundles built from the clips (services/audio_sprite.py)
+SPRITE_DIR = VOICE_ROOT.parent / "sprites"
 
-# Output directory
-AUDIO_DIR = Path(__file__).parent.parent / "static" / "audio" / "voice"
+# Progress journal in the output directory (lets an interrupted run resume where it stopped)
+JOURNAL_FILENAME = ".pregenerate-journal.jsonl"
+
+# Parallel TTS requests and retries per phrase
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
 
 # Template values for phrase generation
 DURATIONS = [5, 10, 15, 20, 25, 30]
@@ -494,36 +511,208 @@ def collect_all_phrases() -> list[str]:
     return sorted(phrases)
 
 
-async def generate_audio(text: str) -> bool:
+class RateController:
+    """
+    AIMD pacing shared by all workers.
+
+    Request starts are spaced at least `delay` seconds apart. Each success
+    shrinks the delay additively; each failure (usually throttling) doubles it.
+    """
+
+    def __init__(self, min_delay: float = 0.0, max_delay: float = 10.0,
+                 initial_delay: float = 0.1, step: float = 0.01):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = initial_delay
+        self.step = step
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Sleep until this worker's turn to start a request."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def success(self):
+        self.delay = max(self.min_delay, self.delay - self.step)
+
+    def failure(self):
+        self.delay = min(self.max_delay, max(self.delay * 2, self.step))
+
+
+class Journal:
+    """
+    Append-only JSONL progress log next to the audio files.
+
+    The first line records the synthesizer signature and whether existing
+    clips are being replaced; each later line records one finished phrase.
+    A run with the same signature resumes from it; a different signature
+    (voice change) starts a fresh journal that regenerates every clip.
+    """
+
+    def __init__(self, path: Path, signature: dict):
+        self.path = path
+        self.signature = signature
+        self.done: set[str] = set()
+        self.voice_changed = False
+        self.regenerate = False
+        self._file = None
+
+    def open(self, force: bool = False):
+        """Load prior progress (unless forced) and open the journal for appending."""
+        entries = self._read()
+        header = entries[0] if entries else None
+
+        if not force and header is not None and header.get("voice") == self.signature:
+            self.regenerate = header.get("regenerate", False)
+            for entry in entries[1:]:
+                if entry.get("status") == "ok":
+                    self.done.add(entry["key"])
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.voice_changed = header is not None and header.get("voice") != self.signature
+            self.regenerate = force or self.voice_changed
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"voice": self.signature, "regenerate": self.regenerate, "started": time.time()})
+
+    def _read(self) -> list[dict]:
+        entries = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # Torn final line from an interrupted run
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def record(self, key: str, status: str, error: str = ""):
+        entry = {"key": key, "status": status}
+        if error:
+            entry["error"] = error
+        self._write(entry)
+        if status == "ok":
+            self.done.add(key)
+
+    def _write(self, entry: dict):
+        # Flush per line so an interrupted run keeps everything finished so far
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def clip_exists(audio_dir: Path, text: str) -> bool:
+    """True if the phrase's MP3 is on disk and non-empty."""
+    try:
+        return (audio_dir / f"{get_cache_key(text)}.mp3").stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+
+async def generate_audio(synthesizer: Synthesizer, audio_dir: Path, text: str, overwrite: bool = False) -> bool:
     """Generate audio for a single phrase."""
     cache_key = get_cache_key(text)
-    output_path = AUDIO_DIR / f"{cache_key}.mp3"
+    output_path = audio_dir / f"{cache_key}.mp3"
 
-    if output_path.exists():
+    if not overwrite and clip_exists(audio_dir, text):
         return True  # Already generated
 
     try:
-        communicate = edge_tts.Communicate(
-            text,
-            voice=VOICE,
-            rate=VOICE_RATE,
-            pitch=VOICE_PITCH
-        )
-        await communicate.save(str(output_path))
-        return output_path.exists()
+        return await synthesizer.save(text, output_path)
     except Exception as e:
         print(f"  ERROR: {e}")
         return False
 
 
-async def main():
+async def run_pipeline(synthesizer: Synthesizer, audio_dir: Path, todo: list[str], journal: Journal,
+                       concurrency: int, retries: int, overwrite: bool) -> tuple[int, int]:
+    """Generate phrases with bounded concurrency. Returns (success, failed)."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for phrase in todo:
+        queue.put_nowait((phrase, 0))
+
+    rate = RateController()
+    counts = {"success": 0, "failed": 0}
+    total = len(todo)
+
+    async def worker():
+        while True:
+            try:
+                phrase, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            await rate.wait()
+            key = get_cache_key(phrase)
+            if await generate_audio(synthesizer, audio_dir, phrase, overwrite=overwrite):
+                rate.success()
+                journal.record(key, "ok")
+                counts["success"] += 1
+                done = counts["success"] + counts["failed"]
+                display_text = phrase[:50] + "..." if len(phrase) > 50 else phrase
+                print(f"[{done}/{total}] {display_text}")
+            else:
+                rate.failure()
+                if attempt < retries:
+                    queue.put_nowait((phrase, attempt + 1))
+                else:
+                    journal.record(key, "failed")
+                    counts["failed"] += 1
+                    print(f"  FAILED: {phrase[:80]}")
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return counts["success"], counts["failed"]
+
+
+def collect_garbage(audio_dir: Path, phrases: list[str], dry_run: bool = False) -> list[Path]:
+    """Delete cached MP3s whose phrase is no longer produced by collect_all_phrases()."""
+    keep = {get_cache_key(p) for p in phrases}
+    orphans = sorted(p for p in audio_dir.glob("*.mp3") if p.stem not in keep)
+    if not dry_run:
+        for path in orphans:
+            path.unlink(missing_ok=True)
+    return orphans
+
+
+def write_manifest(audio_dir: Path, phrases: list[str]):
+    """Write the key -> phrase manifest atomically."""
+    manifest_path = audio_dir / "manifest.json"
+    manifest = {
+        "total_phrases": len(phrases),
+        "phrases": {get_cache_key(p): p for p in phrases}
+    }
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    print(f"Manifest written to: {manifest_path}")
+
+
+async def main(backend: str = "edge", concurrency: int = DEFAULT_CONCURRENCY,
+               retries: int = DEFAULT_RETRIES, force: bool = False,
+               gc: bool = False, dry_run: bool = False):
+    synthesizer = get_synthesizer(backend)
+    audio_dir = VOICE_ROOT / voice_subdir(synthesizer)
+
     print("=" * 60)
     print("YOGA VOICE AUDIO PRE-GENERATION")
     print("=" * 60)
+    print(f"Output: {audio_dir}")
     print()
 
     # Ensure output directory exists
-    AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+    audio_dir.mkdir(parents=True, exist_ok=True)
 
     # Collect all phrases
     print("Collecting phrases...")
@@ -531,59 +720,86 @@ async def main():
     print(f"Total unique phrases: {len(phrases)}")
     print()
 
-    # Count existing files
-    existing = sum(1 for p in phrases if (AUDIO_DIR / f"{get_cache_key(p)}.mp3").exists())
-    print(f"Already generated: {existing}")
-    print(f"Need to generate: {len(phrases) - existing}")
-    print()
+    if gc:
+        orphans = collect_garbage(audio_dir, phrases, dry_run=dry_run)
+        action = "Would delete" if dry_run else "Deleted"
+        print(f"{action} {len(orphans)} orphaned audio files")
+        for path in orphans:
+            print(f"  {path.name}")
+        print()
 
-    if existing == len(phrases):
-        print("All audio files already exist!")
+    if dry_run:
         return
 
-    # Generate audio
-    print("Generating audio files...")
-    print("-" * 60)
+    journal = Journal(audio_dir / JOURNAL_FILENAME, synthesizer.signature())
+    journal.open(force=force)
 
-    success = 0
-    failed = 0
+    # After a voice change every existing clip is stale and must be overwritten
+    overwrite = journal.regenerate
+    if journal.voice_changed:
+        print("Voice settings changed since the last run - regenerating everything")
 
-    for i, phrase in enumerate(phrases, 1):
-        cache_key = get_cache_key(phrase)
-        output_path = AUDIO_DIR / f"{cache_key}.mp3"
+    # The journal only vouches for clips still on disk (cleanups may have removed some)
+    if overwrite:
+        todo = [
+            p for p in phrases
+            if get_cache_key(p) not in journal.done or not clip_exists(audio_dir, p)
+        ]
+    else:
+        todo = [p for p in phrases if not clip_exists(audio_dir, p)]
 
-        if output_path.exists():
-            continue
+    print(f"Already generated: {len(phrases) - len(todo)}")
+    print(f"Need to generate: {len(todo)}")
+    print()
 
-        # Show progress
-        display_text = phrase[:50] + "..." if len(phrase) > 50 else phrase
-        print(f"[{i}/{len(phrases)}] {display_text}")
+    if not todo:
+        journal.close()
+        print("All audio files already exist!")
+        write_manifest(audio_dir, phrases)
+        return
 
-        if await generate_audio(phrase):
-            success += 1
-        else:
-            failed += 1
-            print(f"  FAILED: {phrase[:80]}")
+    # Generate audio
+    print(f"Generating audio files ({concurrency} concurrent)...")
+    print("-" * 60)
 
-        # Small delay to avoid rate limiting
-        await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    try:
+        success, failed = await run_pipeline(
+            synthesizer, audio_dir, todo, journal, concurrency, retries, overwrite
+        )
+    finally:
+        journal.close()
+
+    if success and overwrite:
+        # Regenerated clips may keep their old size; make the app rescan durations
+        (audio_dir / "durations.json").unlink(missing_ok=True)
+        # Sprites bundle the old audio; drop them rather than rely on their keys alone
+        shutil.rmtree(SPRITE_DIR, ignore_errors=True)
 
     print()
     print("=" * 60)
-    print(f"COMPLETE: {success} generated, {failed} failed")
-    print(f"Total audio files: {len(list(AUDIO_DIR.glob('*.mp3')))}")
+    print(f"COMPLETE: {success} generated, {failed} failed in {time.perf_counter() - started:.1f}s")
+    print(f"Total audio files: {len(list(audio_dir.glob('*.mp3')))}")
     print("=" * 60)
 
-    # Write manifest for reference
-    manifest_path = AUDIO_DIR / "manifest.json"
-    manifest = {
-        "total_phrases": len(phrases),
-        "phrases": {get_cache_key(p): p for p in phrases}
-    }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
-    print(f"Manifest written to: {manifest_path}")
+    write_manifest(audio_dir, phrases)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Pre-generate yoga voice audio files")
+    parser.add_argument("--backend", choices=sorted(SYNTHESIZERS), default="edge",
+                        help="TTS backend (default: edge)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Parallel TTS requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries per phrase before giving up (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the journal and regenerate every phrase")
+    parser.add_argument("--gc", action="store_true",
+                        help="Delete audio files for phrases that are no longer used")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --gc, list orphaned files without deleting or generating")
+    args = parser.parse_args()
+    if args.dry_run and not args.gc:
+        parser.error("--dry-run only applies to --gc")
+    asyncio.run(main(args.backend, args.concurrency, args.retries, args.force, args.gc, args.dry_run))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile for the app.
+
+Imports main in a fresh interpreter under `-X importtime`, then builds the
+lazy singletons, and reports:
+- the slowest imports (cumulative and self time, app modules marked with *)
+- how long each singleton took to construct (from utils.startup)
+
+Lifespan work (DB, voice index, page prerender) isn't run; in development
+GET /api/dev/startup shows those timings for a running server.
+
+Usage:
+    python scripts/startup_profile.py
+    python scripts/startup_profile.py --top 40 --app-only
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# App packages and top-level modules (everything else is stdlib or third party)
+APP_MODULES = {
+    path.stem for path in ROOT.iterdir()
+    if path.suffix == ".py" or (path.is_dir() and any(path.glob("*.py")))
+}
+
+REPORT_MARKER = "__STARTUP_REPORT__"
+
+CHILD_CODE = f"""
+import json, time
+start = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - start) * 1000
+from services.pose_catalog import get_pose_catalog
+from services.pose_search import get_pose_search
+from services.pose_graph import get_pose_graph
+from services.session_manifest import get_manifest_generator
+from yoga_voice import get_voice_generator, get_sprite_cache
+for get in (get_pose_catalog, get_pose_search, get_pose_graph, get_manifest_generator,
+            get_voice_generator, get_sprite_cache):
+    get()
+from utils.startup import startup_report
+report = startup_report()
+report["import_main_ms"] = round(import_ms, 1)
+print({REPORT_MARKER!r} + json.dumps(report))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `-X importtime` output as {"module", "self_ms", "cumulative_ms"}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def is_app_module(module: str) -> bool:
+    return module.split(".")[0] in APP_MODULES
+
+
+def print_table(title: str, rows: List[Dict], key: str, top: int):
+    print(f"\n{title}")
+    print(f"{'ms':>10}  module")
+    for row in sorted(rows, key=lambda r: r[key], reverse=True)[:top]:
+        marker = "*" if is_app_module(row["module"]) else " "
+        print(f"{row[key]:>10.1f} {marker}{row['module']}")
+
+
+def main(args):
+    env = dict(os.environ)
+    # The app's config requires a database URL at import time; nothing here connects
+    env.setdefault("DATABASE_URL", "postgresql://profile@localhost/profile")
+    env.setdefault("ENVIRONMENT", "profile")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    report_lines = [line for line in result.stdout.splitlines() if line.startswith(REPORT_MARKER)]
+    if result.returncode != 0 or not report_lines:
+        print(result.stderr[-4000:], file=sys.stderr)
+        return 1
+
+    rows = parse_importtime(result.stderr)
+    report = json.loads(report_lines[-1][len(REPORT_MARKER):])
+    if args.app_only:
+        rows = [row for row in rows if is_app_module(row["module"])]
+
+    print("=" * 60)
+    print(f"Startup profile: import main {report['import_main_ms']:.1f}ms, "
+          f"{len(rows)} modules")
+    print("=" * 60)
+    print_table("Slowest imports (cumulative)", rows, "cumulative_ms", args.top)
+    print_table("Slowest imports (self)", rows, "self_ms", args.top)
+
+    print("\nSingletons and timed steps")
+    print(f"{'ms':>10}  name")
+    for timing in report["timings"]:
+        print(f"{timing['ms']:>10.1f}  {timing['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile app import and singleton construction")
+    parser.add_argument("--top", type=int, default=20, help="Rows per import table")
+    parser.add_argument("--app-only", action="store_true", help="Only list app modules")
+    sys.exit(main(parser.parse_args()))
@@ -1,26 +1,53 @@
 """
 Services package for hohm.studio yoga sessions.
-Provides manifest generation, pose mirroring, transition graphs, and audit logging.
+Provides the pose catalog, search and prerendered pages, manifest generation, pose mirroring, transition graphs, audit logging, and the voice cache index.
+
+Exports are resolved lazily: `import services` loads nothing, and a name
+imports its submodule on first access. Singletons are exported as their
+get_*() accessors (the instance names would clash with submodule names).
 """
 
-from services.session_manifest import generate_manifest, SessionManifestGenerator
-from services.pose_mirroring import mirror_landmarks, mirror_angles, generate_bilateral_pair
-from services.pose_graph import PoseGraph, pose_graph
-from services.audit_logger import SessionAuditLogger, ManifestValidator, create_audit_logger
+import importlib
 
-__all__ = [
+# Export name -> submodule that defines it
+_EXPORTS = {
+    # Pose catalog
+    'PoseCatalog': 'pose_catalog',
+    'get_pose_catalog': 'pose_catalog',
+    # Pose search
+    'PoseSearchIndex': 'pose_search',
+    'get_pose_search': 'pose_search',
+    # Pose pages
+    'PosePages': 'pose_pages',
     # Manifest generation
-    'generate_manifest',
-    'SessionManifestGenerator',
+    'generate_manifest': 'session_manifest',
+    'SessionManifestGenerator': 'session_manifest',
+    'get_manifest_generator': 'session_manifest',
     # Pose mirroring
-    'mirror_landmarks',
-    'mirror_angles',
-    'generate_bilateral_pair',
+    'mirror_landmarks': 'pose_mirroring',
+    'mirror_angles': 'pose_mirroring',
+    'generate_bilateral_pair': 'pose_mirroring',
     # Pose graph
-    'PoseGraph',
-    'pose_graph',
+    'PoseGraph': 'pose_graph',
+    'get_pose_graph': 'pose_graph',
     # Audit logging
-    'SessionAuditLogger',
-    'ManifestValidator',
-    'create_audit_logger',
-]
+    'SessionAuditLogger': 'audit_logger',
+    'ManifestValidator': 'audit_logger',
+    'create_audit_logger': 'audit_logger',
+    # Voice cache
+    'VoiceCacheIndex': 'voice_cache',
+    'VoiceCacheEntry': 'voice_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,242 @@
+"""
+Audio Sprite Cache
+Concatenates a session's voice clips into one MP3 so clients fetch a single file.
+
+Clips are only bundled when they share one sample rate and channel layout;
+otherwise no sprite is built and clients play the per-clip URLs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from utils.debug import debug_log as _debug_log
+from utils.mp3 import iter_frames
+from services.voice_cache import VoiceCacheIndex
+
+
+# Sprite bundle directory (served by the /static mount)
+SPRITE_DIR = Path("static/audio/sprites")
+SPRITE_URL_PREFIX = "/static/audio/sprites"
+
+# Disk budget for cached bundles (least recently used are evicted first)
+MAX_BUNDLES = 64
+MAX_BUNDLE_BYTES = 64 * 1024 * 1024
+
+# Clip sets remembered as unbundleable (mixed formats) so they aren't rescanned on every request
+MAX_UNBUNDLEABLE = 1024
+
+
+class AudioSpriteCache:
+    """Builds and caches per-phrase-set audio sprites with on-disk LRU eviction."""
+
+    def __init__(
+        self,
+        index: VoiceCacheIndex,
+        sprite_dir: Path = SPRITE_DIR,
+        url_prefix: str = SPRITE_URL_PREFIX,
+        max_bundles: int = MAX_BUNDLES,
+        max_bytes: int = MAX_BUNDLE_BYTES,
+        voice_version: str = ""
+    ):
+        self.index = index
+        self.voice_version = voice_version
+        self.sprite_dir = sprite_dir
+        self.url_prefix = url_prefix
+        self.max_bundles = max_bundles
+        self.max_bytes = max_bytes
+        # Serializes builds and eviction, so eviction never removes a bundle mid-build
+        self._lock = threading.Lock()
+        # Bundles whose clips can't be concatenated (mixed audio formats)
+        self._unbundleable: Set[str] = set()
+
+    def bundle_key(self, clips: Dict[str, os.stat_result]) -> str:
+        """
+        Bundle id for a set of clips (clip key -> stat of its file).
+
+        Covers each clip's size and mtime plus the synthesizer version, so
+        clips regenerated under the same names (a voice change) produce a
+        new bundle instead of reusing the old sprite.
+        """
+        parts = [self.voice_version] + [
+            f"{key}:{st.st_size}:{st.st_mtime_ns}" for key, st in sorted(clips.items())
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:24]
+
+    def get_or_build(self, keys: List[str]) -> Optional[Dict]:
+        """
+        Return sprite metadata for the given clip keys, building the bundle if needed.
+
+        Unknown keys are ignored. Returns None if none of the keys are cached,
+        or if the clips don't share one audio format.
+
+        Returns:
+        {
+            "key": "...",
+            "url": "/static/audio/sprites/<key>.mp3",
+            "size": 123456,
+            "duration_ms": 98765,
+            "cues": {
+                "<clip key>": {"byte_offset": 0, "byte_length": 17424, "start_ms": 0, "duration_ms": 2904},
+                ...
+            }
+        }
+
+        Blocking (file I/O) - call via asyncio.to_thread from request handlers.
+        """
+        self.index.ensure_built()
+        clips: Dict[str, os.stat_result] = {}
+        for key in set(keys):
+            if key in self.index:
+                try:
+                    clips[key] = os.stat(self.index.cache_dir / f"{key}.mp3")
+                except OSError:
+                    continue
+        if not clips:
+            return None
+
+        clip_keys = sorted(clips)
+        bundle_key = self.bundle_key(clips)
+        sprite_path = self.sprite_dir / f"{bundle_key}.mp3"
+        meta_path = self.sprite_dir / f"{bundle_key}.json"
+
+        with self._lock:
+            if bundle_key in self._unbundleable:
+                return None
+
+            meta = self._load_meta(meta_path, sprite_path)
+            if meta:
+                # Touch for LRU ordering
+                try:
+                    os.utime(sprite_path)
+                except OSError:
+                    pass
+                return meta
+
+            meta = self._build(bundle_key, clip_keys, sprite_path, meta_path)
+            if meta is None:
+                if len(self._unbundleable) >= MAX_UNBUNDLEABLE:
+                    self._unbundleable.clear()
+                self._unbundleable.add(bundle_key)
+                return None
+            self._evict(keep=bundle_key)
+            return meta
+
+    def _load_meta(self, meta_path: Path, sprite_path: Path) -> Optional[Dict]:
+        """Load a previously built bundle's metadata if both files are intact."""
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if sprite_path.stat().st_size != meta.get("size"):
+                return None
+            return meta
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _build(self, bundle_key: str, clip_keys: List[str], sprite_path: Path, meta_path: Path) -> Optional[Dict]:
+        """
+        Concatenate clip frames into a sprite file and write its metadata.
+        Returns None (writing nothing) if the clips mix sample rates or channel layouts.
+        """
+        self.sprite_dir.mkdir(parents=True, exist_ok=True)
+
+        cues: Dict[str, Dict] = {}
+        byte_offset = 0
+        start_samples = 0
+        sample_rate = 0
+        # (sample rate, channels) of the first frame; every frame must match
+        audio_format = None
+
+        # Unique temp names keep concurrent builds of the same bundle from clobbering each other
+        tmp_suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+        tmp_sprite = sprite_path.with_name(sprite_path.name + tmp_suffix)
+
+        with open(tmp_sprite, "wb") as out:
+            for key in clip_keys:
+                clip_path = self.index.cache_dir / f"{key}.mp3"
+                try:
+                    data = clip_path.read_bytes()
+                except OSError:
+                    continue
+
+                clip_bytes = 0
+                clip_samples = 0
+                for offset, header in iter_frames(data):
+                    frame_format = (header.sample_rate, header.channels)
+                    if audio_format is None:
+                        audio_format = frame_format
+                        sample_rate = header.sample_rate
+                    elif frame_format != audio_format:
+                        # A decoder can't switch formats mid-stream, and cue times would be off
+                        out.close()
+                        tmp_sprite.unlink()
+                        _debug_log(f"[SPRITE] Not bundling {bundle_key}: {key} is {frame_format}, expected {audio_format}")
+                        return None
+                    # Copy whole frames only so the sprite stays decodable at every cue boundary
+                    out.write(data[offset:offset + header.length])
+                    clip_bytes += header.length
+                    clip_samples += header.samples
+
+                if clip_bytes == 0 or not sample_rate:
+                    continue
+
+                cues[key] = {
+                    "byte_offset": byte_offset,
+                    "byte_length": clip_bytes,
+                    "start_ms": round(start_samples * 1000 / sample_rate),
+                    "duration_ms": round(clip_samples * 1000 / sample_rate)
+                }
+                byte_offset += clip_bytes
+                start_samples += clip_samples
+
+        os.replace(tmp_sprite, sprite_path)
+
+        meta = {
+            "key": bundle_key,
+            "url": f"{self.url_prefix}/{sprite_path.name}",
+            "size": byte_offset,
+            "duration_ms": round(start_samples * 1000 / sample_rate) if sample_rate else 0,
+            "cues": cues
+        }
+        tmp_meta = meta_path.with_name(meta_path.name + tmp_suffix)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        _debug_log(f"[SPRITE] Built {bundle_key}: {len(cues)} cues, {byte_offset} bytes")
+        return meta
+
+    def _evict(self, keep: str):
+        """
+        Remove least recently used bundles until within the count and size budget.
+        Called with the lock held; the bundle `keep` (just built) is never removed.
+        """
+        try:
+            bundles = []
+            with os.scandir(self.sprite_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".mp3") and entry.is_file():
+                        st = entry.stat()
+                        bundles.append((st.st_mtime, st.st_size, Path(entry.path)))
+        except FileNotFoundError:
+            return
+
+        bundles.sort()
+        total_bytes = sum(size for _, size, _ in bundles)
+        count = len(bundles)
+        for _, size, path in bundles:
+            if count <= self.max_bundles and total_bytes <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            for stale in (path, path.with_suffix(".json")):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+            count -= 1
+            total_bytes -= size
+            _debug_log(f"[SPRITE] Evicted {path.stem}")
@@ -0,0 +1,218 @@
+"""
+Pose Catalog Service
+Single in-memory copy of the yoga pose data (poses.json), the encyclopedia
+knowledge base and the transition graph data, shared by the pose pages, the
+manifest generator and the pose graph.
+
+Files are parsed once and indexed by id, category, focus and difficulty, with
+related-pose lists precomputed. refresh() re-stats the files at most every
+few seconds and reloads when an mtime changes; `version` increments on every
+load so consumers can tell when derived data is stale.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from utils.debug import debug_log as _debug_log
+from utils.startup import LazySingleton, lazy_module_attributes, timed
+
+
+DATA_DIR = Path("static/data/yoga")
+POSES_PATH = DATA_DIR / "poses.json"
+KNOWLEDGE_BASE_PATH = DATA_DIR / "knowledge_base.json"
+TRANSITIONS_PATH = DATA_DIR / "transitions.json"
+
+# Related poses shown on each encyclopedia page
+RELATED_LIMIT = 4
+
+# Minimum seconds between mtime checks in refresh()
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class _CatalogData:
+    """One immutable load of the catalog (swapped as a whole on reload)."""
+
+    __slots__ = (
+        "poses", "by_id", "by_category", "by_focus", "by_difficulty",
+        "related", "knowledge", "transitions"
+    )
+
+    def __init__(self, poses: List[Dict], knowledge: Dict, transitions: Optional[Dict]):
+        self.poses = poses
+        self.by_id: Dict[str, Dict] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        self.by_focus: Dict[str, List[Dict]] = {}
+        self.by_difficulty: Dict[str, List[Dict]] = {}
+        for pose in poses:
+            self.by_id[pose["id"]] = pose
+            self.by_category.setdefault(pose.get("category"), []).append(pose)
+            self.by_difficulty.setdefault(pose.get("difficulty"), []).append(pose)
+            for focus in pose.get("focus", []):
+                self.by_focus.setdefault(focus, []).append(pose)
+
+        position = {pose["id"]: i for i, pose in enumerate(poses)}
+        self.related = {pose["id"]: self._related(pose, position) for pose in poses}
+        self.knowledge = knowledge
+        self.transitions = transitions
+
+    def _related(self, pose: Dict, position: Dict[str, int]) -> List[Dict]:
+        """First RELATED_LIMIT poses (in file order) sharing the category or a focus."""
+        candidates = {p["id"]: p for p in self.by_category.get(pose.get("category"), [])}
+        for focus in pose.get("focus", []):
+            for p in self.by_focus.get(focus, []):
+                candidates[p["id"]] = p
+        candidates.pop(pose["id"], None)
+        ordered = sorted(candidates.values(), key=lambda p: position[p["id"]])
+        return ordered[:RELATED_LIMIT]
+
+
+class PoseCatalog:
+    """Indexed pose data with throttled mtime-based hot reload."""
+
+    def __init__(
+        self,
+        poses_path: Path = POSES_PATH,
+        knowledge_base_path: Path = KNOWLEDGE_BASE_PATH,
+        transitions_path: Path = TRANSITIONS_PATH,
+        check_interval: float = RELOAD_CHECK_INTERVAL
+    ):
+        self.poses_path = Path(poses_path)
+        self.knowledge_base_path = Path(knowledge_base_path)
+        self.transitions_path = Path(transitions_path)
+        self.check_interval = check_interval
+
+        self.version = 0
+        self._data: Optional[_CatalogData] = None
+        self._mtimes: Dict[Path, Optional[int]] = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[["PoseCatalog"], None]] = []
+
+    # === Loading ===
+
+    @property
+    def _paths(self) -> List[Path]:
+        return [self.poses_path, self.knowledge_base_path, self.transitions_path]
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_json(path: Path, label: str) -> Optional[Dict]:
+        """Parsed file, or None if it's missing. Raises ValueError on invalid JSON."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            _debug_log(f"[CATALOG] {label} not found at {path}")
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path}: {e}") from e
+
+    def load(self) -> bool:
+        """
+        (Re)load all files. On invalid JSON the previous data is kept.
+        Returns True if a new version was loaded.
+        """
+        with self._lock, timed("load pose catalog"):
+            mtimes = {path: self._mtime(path) for path in self._paths}
+            try:
+                poses_data = self._read_json(self.poses_path, "Poses data") or {}
+                knowledge = self._read_json(self.knowledge_base_path, "Knowledge base") or {}
+                transitions = self._read_json(self.transitions_path, "Transitions")
+                data = _CatalogData(poses_data.get("poses", []), knowledge.get("poses", {}), transitions)
+            except (ValueError, KeyError, TypeError) as e:
+                _debug_log(f"[CATALOG] Reload failed, keeping version {self.version}: {e}")
+                self._mtimes = mtimes  # Don't retry until the file changes again
+                if self._data is None:
+                    self._data = _CatalogData([], {}, None)
+                return False
+
+            self._data = data
+            self._mtimes = mtimes
+            self.version += 1
+            _debug_log(f"[CATALOG] Loaded {len(data.poses)} poses (version {self.version})")
+
+        for listener in list(self._listeners):
+            listener(self)
+        return True
+
+    def ensure_loaded(self):
+        """Load the files if this catalog hasn't been loaded yet."""
+        if self._data is None:
+            self.load()
+
+    def refresh(self) -> bool:
+        """Reload if any file changed (checked at most every check_interval seconds)."""
+        if self._data is None:
+            return self.load()
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        if all(self._mtime(path) == mtime for path, mtime in self._mtimes.items()):
+            return False
+        return self.load()
+
+    def on_reload(self, callback: Callable[["PoseCatalog"], None]):
+        """Call callback(catalog) after every successful (re)load."""
+        self._listeners.append(callback)
+
+    # === Lookups ===
+
+    @property
+    def _current(self) -> _CatalogData:
+        """Loaded data (files are read on first use)."""
+        if self._data is None:
+            self.load()
+        return self._data
+
+    @property
+    def poses(self) -> List[Dict]:
+        """All poses in file order."""
+        return self._current.poses
+
+    @property
+    def poses_by_id(self) -> Dict[str, Dict]:
+        return self._current.by_id
+
+    @property
+    def transitions(self) -> Optional[Dict]:
+        """Raw transitions.json data, or None if the file is missing."""
+        return self._current.transitions
+
+    def get(self, pose_id: str) -> Optional[Dict]:
+        return self._current.by_id.get(pose_id)
+
+    def by_category(self, category: str) -> List[Dict]:
+        return self._current.by_category.get(category, [])
+
+    def by_focus(self, focus: str) -> List[Dict]:
+        return self._current.by_focus.get(focus, [])
+
+    def by_difficulty(self, difficulty: str) -> List[Dict]:
+        return self._current.by_difficulty.get(difficulty, [])
+
+    def related(self, pose_id: str) -> List[Dict]:
+        """Poses sharing the category or a focus area (precomputed)."""
+        return self._current.related.get(pose_id, [])
+
+    def knowledge(self, pose_id: str) -> Optional[Dict]:
+        """Knowledge base entry for a pose."""
+        return self._current.knowledge.get(pose_id)
+
+    def __len__(self) -> int:
+        return len(self._current.poses)
+
+
+# Singleton instance (files are read on first use)
+get_pose_catalog: LazySingleton[PoseCatalog] = LazySingleton("pose_catalog", PoseCatalog)
+__getattr__ = lazy_module_attributes(__name__, pose_catalog=get_pose_catalog)
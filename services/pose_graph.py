@@ -7,7 +7,9 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from services.pose_catalog import get_pose_catalog
 from utils.debug import debug_log as _debug_log
+from utils.startup import LazySingleton, lazy_module_attributes
 
 
 @dataclass
@@ -24,67 +26,85 @@ class PoseGraph:
     """Graph-based pose transition manager with bridge injection."""
 
     def __init__(self, transitions_path: Optional[Path] = None):
-        """Initialize the pose graph from transitions.json."""
-        if transitions_path is None:
-            transitions_path = Path("static/data/yoga/transitions.json")
-
+        """
+        Initialize the pose graph from transitions.json.
+        Without an explicit path the data comes from the shared pose catalog,
+        and the graph is rebuilt whenever the catalog reloads.
+        """
         self.transitions: Dict[str, Dict[str, Transition]] = {}
         self.categories: Dict[str, List[str]] = {}
         self.category_transitions: Dict[str, Dict] = {}
         self.pose_id_mapping: Dict[str, str] = {}
         self.reverse_id_mapping: Dict[str, str] = {}
 
-        self._load_graph(transitions_path)
+        if transitions_path is None:
+            catalog = get_pose_catalog()
+            self._build_graph(catalog.transitions)
+            catalog.on_reload(lambda catalog: self._build_graph(catalog.transitions))
+        else:
+            self._load_graph(transitions_path)
 
     def _load_graph(self, path: Path):
         """Load transition graph from JSON file."""
         try:
             with open(path) as f:
                 data = json.load(f)
-
-            self.categories = data.get("categories", {})
-            self.category_transitions = data.get("categoryTransitions", {})
-            self.pose_id_mapping = data.get("poseIdMapping", {})
-
-            # Build reverse mapping
-            self.reverse_id_mapping = {v: k for k, v in self.pose_id_mapping.items()}
-
-            # Build transition graph
-            transitions_data = data.get("transitions", {})
-            for from_pose, targets in transitions_data.items():
-                self.transitions[from_pose] = {}
-                for to_pose, trans_info in targets.items():
-                    self.transitions[from_pose][to_pose] = Transition(
-                        from_pose=from_pose,
-                        to_pose=to_pose,
-                        cost=trans_info.get("cost", 5),
-                        bridge=trans_info.get("bridge"),
-                        transition_ms=trans_info.get("transitionMs", 3000)
-                    )
-
-            _debug_log(f"[GRAPH] Loaded {len(self.transitions)} pose transitions")
-
         except FileNotFoundError:
-            _debug_log(f"[GRAPH] Transitions file not found at {path}, using defaults")
-            self._create_default_graph()
+            data = None
         except json.JSONDecodeError as e:
             _debug_log(f"[GRAPH] Error parsing transitions.json: {e}")
+            data = None
+        self._build_graph(data)
+
+    def _build_graph(self, data: Optional[Dict]):
+        """Build the transition graph from parsed transitions data (defaults if None)."""
+        if data is None:
+            _debug_log("[GRAPH] No transitions data, using defaults")
+            self.categories = {}
+            self.category_transitions = {}
+            self.pose_id_mapping = {}
+            self.reverse_id_mapping = {}
             self._create_default_graph()
+            return
+
+        # Build transition graph (assigned at the end so readers never see a partial graph)
+        transitions: Dict[str, Dict[str, Transition]] = {}
+        for from_pose, targets in data.get("transitions", {}).items():
+            transitions[from_pose] = {}
+            for to_pose, trans_info in targets.items():
+                transitions[from_pose][to_pose] = Transition(
+                    from_pose=from_pose,
+                    to_pose=to_pose,
+                    cost=trans_info.get("cost", 5),
+                    bridge=trans_info.get("bridge"),
+                    transition_ms=trans_info.get("transitionMs", 3000)
+                )
+
+        self.categories = data.get("categories", {})
+        self.category_transitions = data.get("categoryTransitions", {})
+        self.pose_id_mapping = data.get("poseIdMapping", {})
+        # Build reverse mapping
+        self.reverse_id_mapping = {v: k for k, v in self.pose_id_mapping.items()}
+        self.transitions = transitions
+
+        _debug_log(f"[GRAPH] Loaded {len(self.transitions)} pose transitions")
 
     def _create_default_graph(self):
         """Create a minimal default graph if file is missing."""
         default_poses = ["warrior", "tree", "triangle", "downward-dog", "butterfly"]
+        transitions: Dict[str, Dict[str, Transition]] = {}
         for from_pose in default_poses:
-            self.transitions[from_pose] = {}
+            transitions[from_pose] = {}
             for to_pose in default_poses:
                 if from_pose != to_pose:
-                    self.transitions[from_pose][to_pose] = Transition(
+                    transitions[from_pose][to_pose] = Transition(
                         from_pose=from_pose,
                         to_pose=to_pose,
                         cost=5,
                         bridge=None,
                         transition_ms=3000
                     )
+        self.transitions = transitions
 
     def normalize_pose_id(self, pose_id: str) -> str:
         """Convert full pose ID (e.g., 'veerabhadrasana') to short name (e.g., 'warrior')."""
@@ -177,5 +197,6 @@ class PoseGraph:
         return total_ms
 
 
-# Singleton instance
-pose_graph = PoseGraph()
+# Singleton instance (built on first use)
+get_pose_graph: LazySingleton[PoseGraph] = LazySingleton("pose_graph", PoseGraph)
+__getattr__ = lazy_module_attributes(__name__, pose_graph=get_pose_graph)
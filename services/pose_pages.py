@@ -0,0 +1,77 @@
+"""
+Pose Pages Service
+Prerendered /yoga/poses/{pose_id} encyclopedia pages.
+
+Every pose page is rendered to bytes (with its knowledge base entry and
+related poses) in one pass and served from memory. The table is rebuilt when
+the catalog reloads, when the detail template changes, or when the asset
+manifest is reloaded.
+"""
+
+import time
+from typing import Dict, Optional
+
+from services.pose_catalog import PoseCatalog, get_pose_catalog
+from utils.debug import debug_log as _debug_log
+from utils.page_cache import CachedPage, RenderedPageCache
+
+
+TEMPLATE_NAME = "yoga_pose_detail.html"
+
+
+class PosePages:
+    """pose_id -> rendered detail page, kept in step with the catalog."""
+
+    def __init__(
+        self,
+        page_cache: RenderedPageCache,
+        catalog: Optional[PoseCatalog] = None,
+        template_name: str = TEMPLATE_NAME
+    ):
+        self.page_cache = page_cache
+        self._catalog = catalog
+        self.template_name = template_name
+        self._pages: Dict[str, CachedPage] = {}
+        # Catalog version the table was rendered from (None = not built)
+        self.version: Optional[int] = None
+
+    @property
+    def catalog(self) -> PoseCatalog:
+        # Resolved on use, so constructing this at import doesn't load the catalog
+        return self._catalog if self._catalog is not None else get_pose_catalog()
+
+    def build(self) -> int:
+        """Render every pose page. Returns the number of pages."""
+        start = time.perf_counter()
+        catalog = self.catalog
+        catalog.ensure_loaded()
+        version = catalog.version
+        pages = {}
+        for pose in catalog.poses:
+            pages[pose["id"]] = self.page_cache.render(self.template_name, {
+                "pose": pose,
+                "knowledge": catalog.knowledge(pose["id"]),
+                "related_poses": catalog.related(pose["id"])
+            })
+        self._pages = pages
+        self.version = version
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _debug_log(f"[POSE PAGES] Prerendered {len(pages)} pages in {elapsed_ms:.1f}ms (catalog v{version})")
+        return len(pages)
+
+    def _is_stale(self) -> bool:
+        if self.version != self.catalog.version:
+            return True
+        # All pages share the template and asset manifest, so one check covers the table
+        sample = next(iter(self._pages.values()), None)
+        return sample is not None and not self.page_cache.is_fresh(sample)
+
+    def get(self, pose_id: str) -> Optional[CachedPage]:
+        """Rendered page for a pose, or None if there's no such pose."""
+        self.catalog.refresh()
+        if self._is_stale():
+            self.build()
+        return self._pages.get(pose_id)
+
+    def __len__(self) -> int:
+        return len(self._pages)
@@ -0,0 +1,301 @@
+"""
+Pose Search Service
+In-memory inverted index over the pose catalog for GET /api/yoga/poses/search.
+
+Indexed fields (weighted): name, sanskrit, focus tags, benefits, instructions.
+Every query term matches as a prefix of indexed terms (found by bisecting the
+sorted vocabulary), and all query terms must match. Results carry facet counts
+for category, difficulty and focus.
+
+The index follows catalog reloads incrementally: only poses whose indexed
+content changed are re-tokenized. Syncs and searches hold one lock, since a
+sync can come from a catalog reload on another thread (e.g. warm-up).
+"""
+
+import bisect
+import hashlib
+import heapq
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter
+from itertools import chain, islice
+from typing import Dict, List, Optional, Set
+
+from services.pose_catalog import PoseCatalog, get_pose_catalog
+from utils.debug import debug_log as _debug_log
+from utils.startup import LazySingleton, lazy_module_attributes
+
+
+# Relative weight of a term occurrence per field
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "sanskrit": 4.0,
+    "focus": 3.0,
+    "benefits": 1.5,
+    "instructions": 1.0,
+}
+
+# Exact term matches rank above prefix-only matches
+EXACT_MATCH_BONUS = 1.5
+
+FACETS = ("category", "difficulty", "focus")
+
+# Fields returned per result (reference landmarks/angles stay server-side)
+RESULT_FIELDS = ("id", "name", "sanskrit", "category", "difficulty", "focus", "image", "benefits")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ASCII word tokens (diacritics stripped, so 'Vṛkṣāsana' -> 'vrksasana')."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _field_text(pose: Dict, field: str) -> str:
+    value = pose.get(field) or ""
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+class PoseSearchIndex:
+    """Inverted index with prefix lookup and facet counts."""
+
+    def __init__(self, catalog: Optional[PoseCatalog] = None):
+        self.catalog = catalog if catalog is not None else get_pose_catalog()
+        # term -> {pose_id: weight}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # Sorted vocabulary for prefix lookups
+        self._terms: List[str] = []
+        # facet -> value -> pose ids
+        self._facet_postings: Dict[str, Dict[str, Set[str]]] = {facet: {} for facet in FACETS}
+        # pose_id -> (fingerprint of indexed content, {term: weight}, {facet: values})
+        self._docs: Dict[str, tuple] = {}
+        # Poses as indexed (results are built from these, not a possibly newer catalog)
+        self._poses_by_id: Dict[str, Dict] = {}
+        # Pose ids in catalog order (browse order and stable tie-break)
+        self._ids: List[str] = []
+        self._all_ids: frozenset = frozenset()
+        self._order: Dict[str, int] = {}
+        # Catalog version the index reflects (None = not built yet)
+        self.version: Optional[int] = None
+        # Guards all of the above (reentrant: search() may sync)
+        self._lock = threading.RLock()
+
+        self.catalog.on_reload(lambda _: self.sync())
+
+    # === Indexing ===
+
+    @staticmethod
+    def _fingerprint(pose: Dict) -> str:
+        content = {field: pose.get(field) for field in FIELD_WEIGHTS}
+        content.update({facet: pose.get(facet) for facet in FACETS})
+        return hashlib.md5(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _weights(pose: Dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(pose, field)):
+                weights[term] = weights.get(term, 0.0) + field_weight
+        return weights
+
+    @staticmethod
+    def _facet_values(pose: Dict, facet: str) -> List[str]:
+        value = pose.get(facet)
+        if isinstance(value, list):
+            return [str(v) for v in value]
+        return [str(value)] if value else []
+
+    def _remove(self, pose_id: str):
+        _, weights, facet_values = self._docs.pop(pose_id)
+        for term in weights:
+            postings = self._postings[term]
+            del postings[pose_id]
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                del self._terms[index]
+        for facet, values in facet_values.items():
+            by_value = self._facet_postings[facet]
+            for value in values:
+                by_value[value].discard(pose_id)
+                if not by_value[value]:
+                    del by_value[value]
+
+    def _add(self, pose_id: str, fingerprint: str, pose: Dict):
+        weights = self._weights(pose)
+        facet_values = {facet: self._facet_values(pose, facet) for facet in FACETS}
+        self._docs[pose_id] = (fingerprint, weights, facet_values)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[pose_id] = weight
+        for facet, values in facet_values.items():
+            for value in values:
+                self._facet_postings[facet].setdefault(value, set()).add(pose_id)
+
+    def sync(self) -> int:
+        """Bring the index in line with the catalog. Returns the number of poses (re)indexed or removed."""
+        with self._lock:
+            return self._sync()
+
+    def _sync(self) -> int:
+        version = self.catalog.version
+        poses = self.catalog.poses
+        current = {pose["id"]: pose for pose in poses}
+        changed = 0
+
+        for pose_id in [pid for pid in self._docs if pid not in current]:
+            self._remove(pose_id)
+            changed += 1
+
+        for pose_id, pose in current.items():
+            fingerprint = self._fingerprint(pose)
+            existing = self._docs.get(pose_id)
+            if existing and existing[0] == fingerprint:
+                continue
+            if existing:
+                self._remove(pose_id)
+            self._add(pose_id, fingerprint, pose)
+            changed += 1
+
+        self._poses_by_id = current
+        self._ids = [pose["id"] for pose in poses]
+        self._all_ids = frozenset(self._ids)
+        self._order = {pose_id: i for i, pose_id in enumerate(self._ids)}
+        self.version = version
+        if changed:
+            _debug_log(f"[SEARCH] Indexed {changed} poses ({len(self._terms)} terms, catalog v{self.version})")
+        return changed
+
+    # === Querying ===
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with prefix."""
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff", lo=start)
+        return self._terms[start:end]
+
+    def _match(self, terms: List[str]) -> Dict[str, float]:
+        """{pose_id: score} for poses matching every query term (as a prefix)."""
+        scores: Optional[Dict[str, float]] = None
+        for query_term in terms:
+            term_scores: Dict[str, float] = {}
+            for term in self._expand(query_term):
+                bonus = EXACT_MATCH_BONUS if term == query_term else 1.0
+                for pose_id, weight in self._postings[term].items():
+                    term_scores[pose_id] = term_scores.get(pose_id, 0.0) + weight * bonus
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def _facet_counts(self, facet: str, pose_ids: Set[str]) -> Dict[str, int]:
+        """{value: count} of a facet over pose_ids."""
+        by_value = self._facet_postings[facet]
+        if len(pose_ids) == len(self._all_ids):
+            return {value: len(ids) for value, ids in by_value.items()}
+        # Tally each pose's values: work proportional to the matches, not the vocabulary
+        docs = self._docs
+        return Counter(chain.from_iterable(docs[pose_id][2][facet] for pose_id in pose_ids))
+
+    def search(
+        self,
+        query: str = "",
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        focus: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Ranked, filtered, paginated search.
+
+        Facet counts for each facet are computed over the query matches with
+        the *other* filters applied, so a client can show alternatives for
+        the facet it has already narrowed.
+        """
+        self.catalog.ensure_loaded()
+        with self._lock:
+            if self.version != self.catalog.version:
+                self._sync()
+            return self._search(query, category, difficulty, focus, offset, limit)
+
+    def _search(
+        self,
+        query: str,
+        category: Optional[str],
+        difficulty: Optional[str],
+        focus: Optional[str],
+        offset: int,
+        limit: int
+    ) -> Dict:
+        by_id = self._poses_by_id
+        terms = tokenize(query)
+        if terms:
+            scores = self._match(terms)
+            candidates = set(scores)
+        else:
+            scores = {}
+            candidates = self._all_ids
+        order_ids = self._ids
+
+        filters = {"category": category, "difficulty": difficulty, "focus": focus}
+        # facet -> pose ids carrying the selected value
+        selected = {
+            facet: self._facet_postings[facet].get(value, set())
+            for facet, value in filters.items() if value
+        }
+
+        facets: Dict[str, Dict[str, int]] = {}
+        for facet in FACETS:
+            base = candidates
+            for other, ids in selected.items():
+                if other != facet:
+                    base = base & ids
+            facets[facet] = self._facet_counts(facet, base)
+
+        matched = candidates
+        for ids in selected.values():
+            matched = matched & ids
+
+        # Only the requested page needs to be ordered
+        if terms:
+            order = self._order
+            page = heapq.nsmallest(offset + limit, matched, key=lambda pid: (-scores[pid], order[pid]))[offset:]
+        else:
+            page = list(islice((pid for pid in order_ids if pid in matched), offset, offset + limit))
+
+        results = []
+        for pose_id in page:
+            pose = by_id[pose_id]
+            result = {field: pose.get(field) for field in RESULT_FIELDS}
+            if terms:
+                result["score"] = round(scores[pose_id], 2)
+            results.append(result)
+
+        return {
+            "query": query,
+            "total": len(matched),
+            "offset": offset,
+            "limit": limit,
+            "results": results,
+            "facets": {
+                facet: dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+                for facet, counts in facets.items()
+            },
+        }
+
+
+# Singleton instance (indexed on first search)
+get_pose_search: LazySingleton[PoseSearchIndex] = LazySingleton("pose_search", PoseSearchIndex)
+__getattr__ = lazy_module_attributes(__name__, pose_search=get_pose_search)
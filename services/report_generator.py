@@ -8,6 +8,10 @@ class ReportGenerator:
     Generates summary statistics and recommendations based on session logs.
     """
 
+    # Bump when ranking or recommendations change; stored reports from older
+    # versions are recomputed the next time they're read
+    ALGORITHM_VERSION = 2
+
     # Thresholds for session-level warnings
     GOOD_POSTURE_THRESHOLD = 60  # Below this % triggers recommendations
     AVERAGE_SCORE_THRESHOLD = 7.0  # Below this triggers recommendations
@@ -38,8 +42,13 @@ class ReportGenerator:
                 # Skip malformed logs
                 continue
 
-        # Sort by frequency
-        sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
+        return ReportGenerator.rank_issues(issue_counts)
+
+    @staticmethod
+    def rank_issues(issue_counts: Dict[str, int]) -> List[PostureIssueType]:
+        """Issue types ordered by frequency, from a type -> count histogram."""
+        # Sort by frequency, ties by type (same order as get_session_issue_counts)
+        sorted_issues = sorted(issue_counts.items(), key=lambda x: (-x[1], x[0]))
 
         # Safely convert to PostureIssueType
         result = []
@@ -93,3 +102,22 @@ class ReportGenerator:
                 recommendations.append("Great job! Keep up the good posture.")
 
         return recommendations[:3]  # Return top 3
+
+    @staticmethod
+    def build_report(
+        issue_counts: Dict[str, int],
+        good_posture_percentage: Optional[float] = None,
+        average_score: Optional[float] = None
+    ) -> Dict:
+        """Session report (as stored in session_reports) from an issue histogram."""
+        common_issues = ReportGenerator.rank_issues(issue_counts)
+        return {
+            "algorithm_version": ReportGenerator.ALGORITHM_VERSION,
+            "issue_counts": dict(issue_counts),
+            "common_issues": [issue.value for issue in common_issues],
+            "recommendations": ReportGenerator.get_recommendations(
+                common_issues,
+                good_posture_percentage=good_posture_percentage,
+                average_score=average_score
+            )
+        }
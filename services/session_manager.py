@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
 from models.schemas import PostureStatus, PostureIssue
+from services.report_generator import ReportGenerator
 
 class SessionManager:
     """
@@ -21,6 +22,7 @@ class SessionManager:
         self.log_count: int = 0    # Counts actual database log entries
         self.is_active: bool = False
         self.last_update_time: Optional[datetime] = None
+        self.issue_counts: Dict[str, int] = {}  # Issue type -> occurrences in saved logs
 
     def start(self):
         self.session_id = str(uuid.uuid4())
@@ -31,6 +33,7 @@ class SessionManager:
         self.total_score = 0
         self.score_count = 0
         self.log_count = 0
+        self.issue_counts = {}
         self.is_active = True
         return self.session_id
 
@@ -42,6 +45,13 @@ class SessionManager:
         self.total_score += score
         self.score_count += 1
 
+    def record_issues(self, issues: List[Dict]):
+        """Count a saved log's issues toward the session report."""
+        for issue in issues:
+            issue_type = issue.get('type', '')
+            if issue_type:
+                self.issue_counts[issue_type] = self.issue_counts.get(issue_type, 0) + 1
+
     def stop(self):
         self.is_active = False
 
@@ -56,11 +66,19 @@ class SessionManager:
         # Grade = 60% based on good posture %, 40% based on average score
         grade = (good_percentage / 100 * 10) * 0.6 + avg_score * 0.4
 
+        average_score = round(grade, 1)  # This is now the calculated grade
+        good_posture_percentage = round(good_percentage, 1)
+
         return {
             "session_id": self.session_id,
             "duration_minutes": duration_sec / 60.0,
             "good_time_minutes": self.good_time_sec / 60.0,
             "bad_time_minutes": self.bad_time_sec / 60.0,
-            "average_score": round(grade, 1),  # This is now the calculated grade
-            "good_posture_percentage": round(good_percentage, 1)
+            "average_score": average_score,
+            "good_posture_percentage": good_posture_percentage,
+            "report": ReportGenerator.build_report(
+                self.issue_counts,
+                good_posture_percentage=good_posture_percentage,
+                average_score=average_score
+            )
         }
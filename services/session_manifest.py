@@ -4,15 +4,16 @@ Generates v2.0 session manifests with segments, interpolation keyframes, bilater
 """
 
 import uuid
-import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from copy import deepcopy
 
-from services.pose_graph import pose_graph
+from services.pose_catalog import PoseCatalog, get_pose_catalog
+from services.pose_graph import get_pose_graph
 from services.pose_mirroring import generate_bilateral_pair, get_side_landmarks, get_side_angles
 from utils.debug import debug_log as _debug_log
+from utils.startup import LazySingleton, lazy_module_attributes
 
 
 # Session style configurations
@@ -177,23 +178,17 @@ class SessionManifestGenerator:
     """Generates session manifests with bridge injection and bilateral symmetry."""
 
     def __init__(self, poses_path: Optional[Path] = None):
-        """Initialize with pose data."""
+        """Initialize with pose data (the shared catalog unless a file is given)."""
         if poses_path is None:
-            poses_path = Path("static/data/yoga/poses.json")
-
-        self.poses: Dict[str, Dict] = {}
-        self._load_poses(poses_path)
-
-    def _load_poses(self, path: Path):
-        """Load pose data from JSON file."""
-        try:
-            with open(path) as f:
-                data = json.load(f)
-                for pose in data.get("poses", []):
-                    self.poses[pose["id"]] = pose
-            _debug_log(f"[MANIFEST] Loaded {len(self.poses)} poses")
-        except Exception as e:
-            _debug_log(f"[MANIFEST] Error loading poses: {e}")
+            self.catalog = get_pose_catalog()
+        else:
+            self.catalog = PoseCatalog(poses_path=poses_path)
+        _debug_log(f"[MANIFEST] Loaded {len(self.catalog)} poses")
+
+    @property
+    def poses(self) -> Dict[str, Dict]:
+        """Poses by ID from the catalog (reflects hot reloads)."""
+        return self.catalog.poses_by_id
 
     def get_pose(self, pose_id: str) -> Optional[Dict]:
         """Get pose data by ID."""
@@ -221,6 +216,7 @@ class SessionManifestGenerator:
             SessionManifest with all segments, timing, and audio refs
         """
         session_id = str(uuid.uuid4())
+        self.catalog.refresh()
 
         # Get style config (default to vinyasa if invalid)
         style_config = SESSION_STYLES.get(session_style, SESSION_STYLES["vinyasa"])
@@ -240,7 +236,7 @@ class SessionManifestGenerator:
             raw_sequence = self._build_auto_sequence(duration_mins, focus, difficulty)
 
         # Inject bridge poses
-        optimized_sequence = pose_graph.optimize_sequence(raw_sequence)
+        optimized_sequence = get_pose_graph().optimize_sequence(raw_sequence)
 
         _debug_log(f"[MANIFEST] Raw sequence: {len(raw_sequence)} poses")
         _debug_log(f"[MANIFEST] Optimized sequence: {len(optimized_sequence)} poses")
@@ -250,7 +246,7 @@ class SessionManifestGenerator:
 
         # Calculate total duration
         total_duration_ms = sum(seg["holdDurationMs"] for seg in segments)
-        total_duration_ms += pose_graph.calculate_total_transition_time(
+        total_duration_ms += get_pose_graph().calculate_total_transition_time(
             [seg["poseId"] for seg in segments]
         )
 
@@ -284,20 +280,18 @@ class SessionManifestGenerator:
     ) -> List[str]:
         """Build an automatic pose sequence based on parameters."""
         total_seconds = duration_mins * 60
-        available_poses = list(self.poses.values())
+        # Focus index from the catalog ("all" = every pose)
+        candidates = self.catalog.poses if focus == "all" else self.catalog.by_focus(focus)
 
         # Filter to only poses with complete reference data (landmarks required for skeleton overlay)
         available_poses = [
-            p for p in available_poses
+            p for p in candidates
             if p.get("reference_landmarks") and len(p.get("reference_landmarks", [])) > 0
         ]
         _debug_log(f"[MANIFEST] {len(available_poses)} poses with complete reference data")
 
-        # Filter by focus
-        if focus != "all":
-            available_poses = [p for p in available_poses if focus in p.get("focus", [])]
-            if not available_poses:
-                available_poses = list(self.poses.values())
+        if focus != "all" and not available_poses:
+            available_poses = list(self.poses.values())
 
         # Sort by difficulty for phased approach
         beginner = [p for p in available_poses if p.get("difficulty") == "beginner"]
@@ -661,15 +655,18 @@ class SessionManifestGenerator:
             current["interpolation"]["fromIndex"] = prev["index"]
 
             # Get transition duration from graph
-            trans_ms = pose_graph.get_transition_duration_ms(
+            trans_ms = get_pose_graph().get_transition_duration_ms(
                 prev["poseId"],
                 current["poseId"]
             )
             current["interpolation"]["durationMs"] = trans_ms
 
 
-# Singleton instance
-manifest_generator = SessionManifestGenerator()
+# Singleton instance (built on first use)
+get_manifest_generator: LazySingleton[SessionManifestGenerator] = LazySingleton(
+    "manifest_generator", SessionManifestGenerator
+)
+__getattr__ = lazy_module_attributes(__name__, manifest_generator=get_manifest_generator)
 
 
 def generate_manifest(
@@ -691,7 +688,7 @@ def generate_manifest(
 
     Returns manifest as a dictionary ready for JSON serialization.
     """
-    manifest = manifest_generator.generate(
+    manifest = get_manifest_generator().generate(
         duration_mins=duration_mins,
         focus=focus,
         difficulty=difficulty,
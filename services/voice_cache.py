@@ -0,0 +1,189 @@
+"""
+Voice Cache Index
+In-memory index of pre-generated voice clips so script assembly never touches the filesystem.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from dataclasses import dataclass
+from utils.debug import debug_log as _debug_log
+from utils.mp3 import scan_mp3
+
+
+# Public URL prefix the /static mount serves the voice cache under
+VOICE_URL_PREFIX = "/static/audio/voice"
+
+# Sidecar file persisting clip durations so startup doesn't rescan every MP3
+DURATIONS_FILENAME = "durations.json"
+
+
+@dataclass
+class VoiceCacheEntry:
+    """A single cached voice clip."""
+    key: str
+    url: str
+    size: int
+    duration_ms: Optional[int] = None
+
+
+class VoiceCacheIndex:
+    """Hash -> clip metadata for every MP3 in the voice cache directory."""
+
+    def __init__(self, cache_dir: Path, url_prefix: str = VOICE_URL_PREFIX, version: str = ""):
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix
+        # Synthesizer version appended as ?v= (clips are overwritten in place on a voice change)
+        self.version = version
+        self.durations_path = cache_dir / DURATIONS_FILENAME
+        self.entries: Dict[str, VoiceCacheEntry] = {}
+        self._built = False
+        self._dirty = False  # Entries added since the sidecar was last written
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def build(self) -> int:
+        """
+        Scan the cache directory once and (re)build the index.
+
+        Durations come from the sidecar file when its recorded size still
+        matches the clip; anything new or changed is scanned and the sidecar
+        is rewritten. Empty files left behind by failed generations are
+        skipped so they get regenerated instead of being served as silent clips.
+
+        Returns the number of indexed clips.
+        """
+        known = self._load_durations()
+        entries: Dict[str, VoiceCacheEntry] = {}
+        dirty = False
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    if not name.endswith(".mp3") or not dir_entry.is_file():
+                        continue
+                    size = dir_entry.stat().st_size
+                    if size == 0:
+                        continue
+                    key = name[:-4]
+
+                    cached = known.get(key)
+                    if cached and cached.get("size") == size:
+                        duration_ms = cached.get("duration_ms")
+                    else:
+                        duration_ms = self._probe_duration(dir_entry.path)
+                        dirty = True
+
+                    entries[key] = VoiceCacheEntry(
+                        key=key,
+                        url=self._url(name),
+                        size=size,
+                        duration_ms=duration_ms
+                    )
+        except FileNotFoundError:
+            _debug_log(f"[VOICE] Cache directory not found: {self.cache_dir}")
+
+        with self._lock:
+            self.entries = entries
+            self._built = True
+            self._dirty = False
+
+        if dirty or len(known) != len(entries):
+            self._save_durations()
+
+        _debug_log(f"[VOICE] Indexed {len(entries)} cached clips")
+        return len(entries)
+
+    def ensure_built(self):
+        """Build the index if startup has not done so yet (blocking; concurrent callers share one build)."""
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built:
+                self.build()
+
+    def get(self, key: str) -> Optional[VoiceCacheEntry]:
+        """Look up a clip by cache key (pure dictionary lookup)."""
+        return self.entries.get(key)
+
+    def add(self, key: str) -> Optional[VoiceCacheEntry]:
+        """
+        Register a freshly generated clip (blocking: stats and scans the file).
+        The durations sidecar isn't rewritten here; call flush() once a batch is done.
+        Returns the new entry, or None if the file is missing or empty.
+        """
+        path = self.cache_dir / f"{key}.mp3"
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return None
+        if size == 0:
+            return None
+
+        entry = VoiceCacheEntry(
+            key=key,
+            url=self._url(path.name),
+            size=size,
+            duration_ms=self._probe_duration(path)
+        )
+        with self._lock:
+            self.entries[key] = entry
+            self._dirty = True
+        return entry
+
+    def flush(self) -> bool:
+        """Write the durations sidecar if clips were added since the last write."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._dirty = False
+        self._save_durations()
+        return True
+
+    def _url(self, filename: str) -> str:
+        url = f"{self.url_prefix}/{filename}"
+        return f"{url}?v={self.version}" if self.version else url
+
+    def _probe_duration(self, path) -> Optional[int]:
+        """Exact clip duration from MP3 frame headers (None if unreadable)."""
+        try:
+            info = scan_mp3(path)
+        except OSError:
+            return None
+        return info.duration_ms if info else None
+
+    def _load_durations(self) -> Dict[str, Dict]:
+        """Read the durations sidecar, tolerating a missing or corrupt file."""
+        try:
+            with open(self.durations_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("clips", {}) if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_durations(self):
+        """Atomically rewrite the durations sidecar from the current index."""
+        with self._lock:
+            clips = {
+                key: {"size": e.size, "duration_ms": e.duration_ms}
+                for key, e in sorted(self.entries.items())
+            }
+        tmp_path = self.durations_path.with_suffix(".json.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"clips": clips}, f, indent=1)
+            os.replace(tmp_path, self.durations_path)
+        except OSError as e:
+            _debug_log(f"[VOICE] Could not write durations sidecar: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
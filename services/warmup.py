@@ -0,0 +1,141 @@
+"""
+Warm-up Service
+Startup work that runs before an instance reports ready (GET /ready).
+
+The first requests after a deploy used to pay for database connection
+setup, JSON parsing, template compilation and the voice cache scan. Warm-up
+does that work in the background as soon as the app starts: /health (liveness)
+answers immediately, while /ready returns 503 until warm-up completes and the
+database is reachable, so load balancers only route to warm instances.
+
+The database lane (schema init, pool warm-up) runs alongside the local lane
+(catalog, templates, prerendered pages, voice index, common manifests).
+A failed local step is recorded but doesn't block readiness; the database
+lane retries until the database answers. Steps that touch objects requests
+also use (catalog, search index, pose pages) run on the event loop; the rest
+run in worker threads.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from jinja2 import Environment
+
+from models.database import init_db, warm_pool
+from services.pose_catalog import get_pose_catalog
+from services.pose_search import get_pose_search
+from services.session_manifest import generate_manifest
+from utils.debug import debug_log as _debug_log
+from utils.startup import timed
+
+
+# Seconds to wait between database attempts (the last delay repeats)
+DB_RETRY_DELAYS = (1, 2, 5, 10, 30)
+
+# Manifests generated once so the sequencing code paths and pose graph are warm
+COMMON_MANIFESTS: List[Dict] = [
+    {"duration_mins": 15, "focus": "all", "difficulty": "beginner"},
+    {"duration_mins": 30, "focus": "all", "difficulty": "beginner"},
+    {"duration_mins": 15, "focus": "all", "difficulty": "beginner", "session_style": "power"},
+]
+
+
+async def warm_database():
+    """Create/verify the schema and open the pool, retrying until the database answers."""
+    attempt = 0
+    while not await init_db():
+        delay = DB_RETRY_DELAYS[min(attempt, len(DB_RETRY_DELAYS) - 1)]
+        attempt += 1
+        _debug_log(f"[WARMUP] Database not ready (attempt {attempt}), retrying in {delay}s")
+        await asyncio.sleep(delay)
+    await warm_pool()
+
+
+def load_catalog():
+    """Parse the pose data and build the search index."""
+    get_pose_catalog().ensure_loaded()
+    get_pose_search().sync()
+
+
+def compile_templates(environments: Iterable[Environment]):
+    """Compile every HTML template into each environment's template cache."""
+    for env in environments:
+        for name in env.list_templates(extensions=["html"]):
+            env.get_template(name)
+
+
+def build_voice_index():
+    from yoga_voice import get_voice_generator  # Deferred: pulls in the TTS and audio modules
+    get_voice_generator().index.build()
+
+
+def generate_common_manifests():
+    for params in COMMON_MANIFESTS:
+        generate_manifest(**params)
+
+
+class Warmup:
+    """Runs the warm-up steps once and tracks their outcome for /ready."""
+
+    def __init__(self):
+        self.complete = False
+        self.steps: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _step(self, name: str, func: Callable, *args, in_thread: bool = True) -> bool:
+        """Run one step (sync steps in a worker thread unless in_thread is False). Returns True on success."""
+        self.steps[name] = {"status": "running"}
+        start = time.perf_counter()
+        try:
+            with timed(f"warmup {name}"):
+                if inspect.iscoroutinefunction(func):
+                    await func(*args)
+                elif in_thread:
+                    await asyncio.to_thread(func, *args)
+                else:
+                    func(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.steps[name] = {"status": "failed", "error": str(e)}
+            _debug_log(f"[WARMUP] {name} failed: {e}")
+            return False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.steps[name] = {"status": "done", "ms": round(elapsed_ms, 1)}
+        return True
+
+    async def run(self, template_environments: Iterable[Environment], pose_pages):
+        async def local_lane():
+            # On the loop: a reload syncs the search index, which requests read
+            await self._step("catalog", load_catalog, in_thread=False)
+            await self._step("templates", compile_templates, list(template_environments))
+            await self._step("pose pages", pose_pages.build, in_thread=False)
+            await self._step("voice index", build_voice_index)
+            await self._step("manifests", generate_common_manifests)
+
+        start = time.perf_counter()
+        await asyncio.gather(self._step("database", warm_database), local_lane())
+        self.complete = True
+        _debug_log(f"[WARMUP] Complete in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def start(self, template_environments: Iterable[Environment], pose_pages):
+        """Start warm-up in the background."""
+        self.complete = False
+        self._task = asyncio.create_task(self.run(template_environments, pose_pages))
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> Dict:
+        return {"complete": self.complete, "steps": dict(self.steps)}
+
+
+# Singleton instance
+warmup = Warmup()
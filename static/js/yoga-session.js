@@ -124,6 +124,7 @@ class YogaSession {
 
         // Voice script
         this.voiceScript = [];
+        this.voiceSprite = null;  // { blob, cues } once the session's sprite is downloaded
         this.isVoicePlaying = false;
         this.currentAmbientTrack = 'permafrost';
         this.ambientTracks = {};
@@ -731,7 +732,8 @@ class YogaSession {
                 focus: params.get('focus') || 'all',
                 poses: posesForVoice,
                 style: this.manifest?.timing?.sessionStyle || params.get('style') || 'vinyasa',
-                breathCues: this.manifest?.timing?.breathCues ?? true
+                breathCues: this.manifest?.timing?.breathCues ?? true,
+                compact: true  // Deduplicated phrase table (expanded below)
             };
 
             console.log('%c[VOICE] ========== GENERATING VOICE SCRIPT ==========', 'color: #d4a574; font-weight: bold; font-size: 14px');
@@ -764,7 +766,9 @@ class YogaSession {
             }
 
             const data = await response.json();
-            this.voiceScript = data.script || [];
+            this.voiceScript = data.format === 'compact'
+                ? this.expandVoiceScript(data)
+                : (data.script || []);
 
             if (this.voiceScript.length === 0) {
                 console.warn('[VOICE] Voice script is empty - session will run without voice guidance');
@@ -797,6 +801,9 @@ class YogaSession {
             });
             console.log('[VOICE] Instructions per pose:', instructionsPerPose);
             console.log('%c[VOICE] ==========================================', 'color: #7c9a92; font-weight: bold');
+
+            // Fetch all clips as one file in the background; until it arrives clips play from their own URLs
+            this.loadVoiceSprite();
         } catch (error) {
             console.warn('Failed to generate voice script:', error);
             this.voiceScript = [];
@@ -810,6 +817,62 @@ class YogaSession {
         }
     }
 
+    async loadVoiceSprite() {
+        this.voiceSprite = null;
+        const audioUrls = [...new Set(this.voiceScript.map(item => item?.audio_url).filter(Boolean))];
+        if (audioUrls.length === 0) return;
+
+        try {
+            const response = await fetch('/api/yoga/voice-sprite', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ audio_urls: audioUrls })
+            });
+            if (!response.ok) {
+                throw new Error(`Sprite API returned ${response.status}`);
+            }
+            const sprite = await response.json();
+
+            const audioResponse = await fetch(sprite.url);
+            if (!audioResponse.ok) {
+                throw new Error(`Sprite download returned ${audioResponse.status}`);
+            }
+            const blob = await audioResponse.blob();
+            if (blob.size !== sprite.size) {
+                throw new Error(`Sprite size ${blob.size} != ${sprite.size}`);
+            }
+
+            this.voiceSprite = { blob, cues: sprite.cues || {} };
+            console.log(`[VOICE] Sprite loaded: ${Object.keys(this.voiceSprite.cues).length} cues, ${blob.size} bytes`);
+        } catch (error) {
+            console.warn('[VOICE] Sprite unavailable, playing clips individually:', error.message);
+        }
+    }
+
+    getSpriteCue(item) {
+        // Sprite cues are keyed by the clip's cache key (the hash in its URL)
+        if (!this.voiceSprite || !item.audio_url) return null;
+        const match = item.audio_url.match(/([a-f0-9]{32})\.mp3(?:\?|$)/);
+        return match ? this.voiceSprite.cues[match[1]] || null : null;
+    }
+
+    expandVoiceScript(data) {
+        // Rebuild flat script items from a compact phrase-table response
+        const phrases = data.phrases || [];
+        const pools = data.pools || [];
+        const script = [];
+        (data.script || []).forEach(entry => {
+            if (entry.pool !== undefined) {
+                const { pool, ...rest } = entry;
+                (pools[pool] || []).forEach(id => script.push({ ...rest, ...phrases[id] }));
+            } else {
+                const { phrase, ...rest } = entry;
+                script.push({ ...rest, ...phrases[phrase] });
+            }
+        });
+        return script;
+    }
+
     getScriptItemsForTiming(timing, poseIndex = null) {
         // Guard against null/undefined voiceScript
         if (!this.voiceScript || !Array.isArray(this.voiceScript)) {
@@ -883,7 +946,7 @@ class YogaSession {
         }
     }
 
-    async playVoiceItem(item) {
+    async playVoiceItem(item, useSprite = true) {
         if (!this.voiceEnabled) {
             console.log('[VOICE] Disabled, skipping:', item.text?.substring(0, 30));
             return;
@@ -897,7 +960,14 @@ class YogaSession {
             return;
         }
 
-        return new Promise((resolve) => {
+        // Play from the session sprite when it has this clip: its cue is a run of
+        // whole MP3 frames, so the byte range plays on its own
+        const cue = useSprite ? this.getSpriteCue(item) : null;
+        const src = cue
+            ? URL.createObjectURL(this.voiceSprite.blob.slice(cue.byte_offset, cue.byte_offset + cue.byte_length, 'audio/mpeg'))
+            : item.audio_url;
+
+        const played = await new Promise((resolve) => {
             const audio = this.elements.voiceAudio;
             let resolved = false;
 
@@ -910,17 +980,19 @@ class YogaSession {
                     audio.oncanplaythrough = null;
                     audio.onloadeddata = null;
                     clearTimeout(timeout);
+                    if (cue) URL.revokeObjectURL(src);
                     console.log(`[VOICE] Audio done: ${reason} - "${item.text?.substring(0, 30)}..."`);
-                    resolve();
+                    resolve(reason !== 'error');
                 }
             };
 
-            // Timeout fallback - if audio doesn't complete within 30 seconds, skip it
+            // Timeout fallback - if audio doesn't complete in time (30s, or the cue's length plus slack), skip it
+            const timeoutMs = cue ? cue.duration_ms + 5000 : 30000;
             const timeout = setTimeout(() => {
-                console.warn('[VOICE] Audio timeout after 30s:', item.text?.substring(0, 30));
+                console.warn(`[VOICE] Audio timeout after ${timeoutMs}ms:`, item.text?.substring(0, 30));
                 audio.pause();
                 safeResolve('timeout');
-            }, 30000);
+            }, timeoutMs);
 
             this.isVoicePlaying = true;
 
@@ -930,7 +1002,7 @@ class YogaSession {
             };
 
             audio.onerror = (e) => {
-                console.warn('[VOICE] Audio error:', e.type, item.audio_url);
+                console.warn('[VOICE] Audio error:', e.type, cue ? `${item.audio_url} (sprite)` : item.audio_url);
                 safeResolve('error');
             };
 
@@ -947,11 +1019,16 @@ class YogaSession {
             };
 
             // Set source and start loading
-            console.log('[VOICE] Loading:', item.audio_url);
-            audio.src = item.audio_url;
+            console.log('[VOICE] Loading:', cue ? `${item.audio_url} (sprite)` : item.audio_url);
+            audio.src = src;
             audio.volume = this.voiceVolume;
             audio.load();
         });
+
+        // A sprite cue that won't decode falls back to the clip's own URL
+        if (!played && cue) {
+            return this.playVoiceItem(item, false);
+        }
     }
 
     async playVoiceSequence(items) {
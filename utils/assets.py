@@ -0,0 +1,49 @@
+"""Fingerprinted static asset URLs (see scripts/build_assets.py)."""
+
+import json
+from pathlib import Path
+from typing import Dict
+
+from utils.debug import debug_log
+
+STATIC_URL_PREFIX = "/static"
+MANIFEST_PATH = Path("static/dist/manifest.json")
+
+
+class AssetManifest:
+    """Maps asset paths (relative to static/) to their content-hashed copies."""
+
+    def __init__(self, manifest_path: Path = MANIFEST_PATH, url_prefix: str = STATIC_URL_PREFIX):
+        self.manifest_path = manifest_path
+        self.url_prefix = url_prefix
+        self.assets: Dict[str, str] = {}
+        self._loaded = False
+        # Bumped on every load so cached pages rendered with old URLs can be detected
+        self.version = 0
+
+    def load(self) -> int:
+        """(Re)load the manifest. A missing manifest means unhashed URLs are used."""
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.assets = json.load(f).get("assets", {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            self.assets = {}
+        self._loaded = True
+        self.version += 1
+        debug_log(f"[ASSETS] Loaded {len(self.assets)} fingerprinted assets")
+        return len(self.assets)
+
+    def url(self, path: str) -> str:
+        """Public URL for an asset, e.g. url('js/yoga-session.js')."""
+        if not self._loaded:
+            self.load()
+        path = path.lstrip("/")
+        return f"{self.url_prefix}/{self.assets.get(path, path)}"
+
+
+asset_manifest = AssetManifest()
+
+
+def asset_url(path: str) -> str:
+    """Jinja2 global: fingerprinted URL for a static asset, falling back to the plain path."""
+    return asset_manifest.url(path)
@@ -0,0 +1,202 @@
+"""MP3 frame header scanning (pure Python, no decoding)."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+# Bitrate tables in kbps, indexed by the 4-bit bitrate index (0 = free format, 15 = invalid)
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates by version bits (0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+@dataclass
+class FrameHeader:
+    """Decoded fields of a single MPEG audio frame header."""
+    length: int  # Frame length in bytes, including the header
+    samples: int  # PCM samples per channel in this frame
+    sample_rate: int
+    bitrate_kbps: int
+    side_info_size: int  # Layer III side information size (0 for layers I/II)
+    channels: int = 2  # 1 for mono, 2 for stereo / joint stereo / dual channel
+
+
+@dataclass
+class Mp3Info:
+    """Result of scanning an MP3 file."""
+    duration_ms: int
+    frame_count: int
+    sample_rate: int
+    audio_offset: int  # Byte offset of the first audio frame
+    audio_size: int  # Bytes of audio frames (excludes tags and Xing/Info frames)
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse the 4-byte frame header at offset. Returns None if it is not a valid header."""
+    if offset + 4 > len(data):
+        return None
+
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    channel_mode = (b3 >> 6) & 0x03
+
+    # Reserved / unsupported values (free-format bitrate can't be framed without lookahead)
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    is_mpeg1 = version_bits == 3
+    bitrate_kbps = _BITRATES[(1 if is_mpeg1 else 2, layer)][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    bitrate = bitrate_kbps * 1000
+
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 2:
+        length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    elif is_mpeg1:
+        length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    else:
+        length = 72 * bitrate // sample_rate + padding
+        samples = 576
+
+    side_info_size = 0
+    if layer == 3:
+        mono = channel_mode == 3
+        if is_mpeg1:
+            side_info_size = 17 if mono else 32
+        else:
+            side_info_size = 9 if mono else 17
+
+    return FrameHeader(
+        length=length,
+        samples=samples,
+        sample_rate=sample_rate,
+        bitrate_kbps=bitrate_kbps,
+        side_info_size=side_info_size,
+        channels=1 if channel_mode == 3 else 2
+    )
+
+
+def skip_id3v2(data: bytes) -> int:
+    """Return the offset just past a leading ID3v2 tag (0 if there is none)."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (
+            (data[6] & 0x7F) << 21 |
+            (data[7] & 0x7F) << 14 |
+            (data[8] & 0x7F) << 7 |
+            (data[9] & 0x7F)
+        )
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _is_info_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """True if the frame is a Xing/Info (VBR metadata) frame rather than audio."""
+    tag_offset = offset + 4 + header.side_info_size
+    return data[tag_offset:tag_offset + 4] in (b"Xing", b"Info")
+
+
+def _resync(data: bytes, start: int) -> int:
+    """Find the next offset holding a valid header followed by another valid header (or EOF)."""
+    end = len(data)
+    pos = data.find(b"\xff", start)
+    while 0 <= pos:
+        header = parse_frame_header(data, pos)
+        if header:
+            next_offset = pos + header.length
+            if next_offset == end or parse_frame_header(data, next_offset):
+                return pos
+        pos = data.find(b"\xff", pos + 1)
+    return -1
+
+
+def iter_frames(data: bytes) -> Iterator[Tuple[int, FrameHeader]]:
+    """
+    Yield (offset, header) for every audio frame in an MP3 byte string.
+
+    Leading ID3v2 tags and Xing/Info frames are skipped. Garbage between
+    frames is skipped by resyncing on the next header whose successor is
+    also a valid header; a trailing ID3v1 tag ends the scan.
+    """
+    offset = skip_id3v2(data)
+    end = len(data)
+    first = True
+
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header.length > end:
+            # Lost sync - look for the next plausible header
+            offset = _resync(data, offset + 1)
+            if offset < 0:
+                return
+            continue
+
+        if first and _is_info_frame(data, offset, header):
+            first = False
+            offset += header.length
+            continue
+
+        first = False
+        yield offset, header
+        offset += header.length
+
+
+def scan_mp3(source: Union[bytes, str, Path]) -> Optional[Mp3Info]:
+    """
+    Compute the exact duration of an MP3 by walking its frame headers.
+    Returns None if no audio frames are found.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source
+
+    total_samples = 0
+    frame_count = 0
+    sample_rate = 0
+    audio_offset = 0
+    audio_size = 0
+
+    for offset, header in iter_frames(data):
+        if frame_count == 0:
+            audio_offset = offset
+            sample_rate = header.sample_rate
+        total_samples += header.samples
+        audio_size += header.length
+        frame_count += 1
+
+    if frame_count == 0 or sample_rate == 0:
+        return None
+
+    return Mp3Info(
+        duration_ms=round(total_samples * 1000 / sample_rate),
+        frame_count=frame_count,
+        sample_rate=sample_rate,
+        audio_offset=audio_offset,
+        audio_size=audio_size
+    )
@@ -0,0 +1,174 @@
+"""
+Rendered-page cache for templates whose output doesn't depend on the request.
+
+Pages are rendered once per (template, context fingerprint) and kept as
+bytes with a strong ETag. Requests carrying a matching If-None-Match get a
+304 without rendering or sending the body. An entry is re-rendered when the
+template or any template it extends/includes changes on disk (mtimes are
+checked at most every few seconds) or when the asset manifest is reloaded,
+since asset_url() output is baked into the page.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import meta
+from starlette.requests import Request
+from starlette.responses import Response
+
+from middleware.cache_policy import REVALIDATE
+from utils.assets import asset_manifest
+
+
+# Minimum seconds between template mtime checks per entry
+CHECK_INTERVAL = 2.0
+
+# Rendered variants kept before the least recently used are dropped
+MAX_ENTRIES = 256
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 specifies for this header)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CachedPage:
+    """Rendered body, its ETag and what it was rendered from."""
+
+    __slots__ = ("body", "etag", "dependencies", "asset_version", "checked_at")
+
+    def __init__(self, body: bytes, dependencies: List[Tuple[str, Optional[int]]], asset_version: int):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        # [(template file path, mtime_ns)]
+        self.dependencies = dependencies
+        self.asset_version = asset_version
+        self.checked_at = time.monotonic()
+
+
+def page_response(request: Request, page: CachedPage) -> Response:
+    """HTML response for a rendered page, or 304 if the client's copy is current."""
+    headers = {"ETag": page.etag, "Cache-Control": REVALIDATE}
+    if etag_matches(request.headers.get("if-none-match", ""), page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(page.body, media_type="text/html", headers=headers)
+
+
+class RenderedPageCache:
+    """Render-once cache in front of a Jinja2Templates instance."""
+
+    def __init__(
+        self,
+        templates: Jinja2Templates,
+        max_entries: int = MAX_ENTRIES,
+        check_interval: float = CHECK_INTERVAL
+    ):
+        self.templates = templates
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], CachedPage]" = OrderedDict()
+        # template path -> (mtime_ns, referenced template names)
+        self._referenced: Dict[str, Tuple[Optional[int], List[str]]] = {}
+
+    @staticmethod
+    def fingerprint(context: Dict) -> str:
+        """Digest of the context, ignoring the request object."""
+        values = {key: value for key, value in context.items() if key != "request"}
+        if not values:
+            return ""
+        encoded = json.dumps(values, sort_keys=True, default=repr).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _dependencies(self, name: str) -> List[Tuple[str, Optional[int]]]:
+        """The template file and every template it references, with their mtimes."""
+        env = self.templates.env
+        seen = set()
+        pending = [name]
+        dependencies = []
+        while pending:
+            template_name = pending.pop()
+            if template_name in seen:
+                continue
+            seen.add(template_name)
+            source, path, _ = env.loader.get_source(env, template_name)
+            mtime = self._mtime(path)
+            dependencies.append((path, mtime))
+            pending.extend(self._references(path, mtime, source))
+        return dependencies
+
+    def _references(self, path: str, mtime: Optional[int], source: str) -> List[str]:
+        """Templates a template extends/includes/imports (parsed once per mtime)."""
+        cached = self._referenced.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        env = self.templates.env
+        # None for dynamic names, which can't be tracked
+        names = [name for name in meta.find_referenced_templates(env.parse(source)) if name]
+        self._referenced[path] = (mtime, names)
+        return names
+
+    def is_fresh(self, entry: CachedPage) -> bool:
+        """False once the entry's templates or the asset manifest have changed."""
+        if entry.asset_version != asset_manifest.version:
+            return False
+        now = time.monotonic()
+        if now - entry.checked_at < self.check_interval:
+            return True
+        entry.checked_at = now
+        return all(self._mtime(path) == mtime for path, mtime in entry.dependencies)
+
+    def render(self, name: str, context: Dict) -> CachedPage:
+        """Render a template into a CachedPage (not stored in this cache)."""
+        # Stat before rendering, so an edit during the render marks the entry stale
+        dependencies = self._dependencies(name)
+        asset_version = asset_manifest.version
+        body = self.templates.get_template(name).render(context).encode("utf-8")
+        return CachedPage(body, dependencies, asset_version)
+
+    def get(self, name: str, context: Dict) -> CachedPage:
+        """Cached rendering of a template, rendering it on a miss or when stale."""
+        key = (name, self.fingerprint(context))
+        entry = self._entries.get(key)
+        if entry is not None and self.is_fresh(entry):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self.render(name, context)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def response(self, request: Request, name: str, context: Optional[Dict] = None) -> Response:
+        """HTML response for a template, or 304 if the client's copy is current."""
+        context = {"request": request, **(context or {})}
+        return page_response(request, self.get(name, context))
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,93 @@
+"""
+Startup profiling and lazily constructed singletons.
+
+Module-level singletons that read files or touch the filesystem are built on
+first use through LazySingleton, so importing the app stays cheap. Their
+construction time, and any step wrapped in timed() (e.g. lifespan work), is
+recorded for the development startup report (GET /api/dev/startup); see
+scripts/startup_profile.py for the matching -X importtime breakdown.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+from utils.debug import debug_log
+
+T = TypeVar("T")
+
+# Reference point for "at" offsets: roughly when the app started importing
+_STARTED = time.perf_counter()
+
+# Most recent timings (reloads are recorded too, so keep it bounded)
+MAX_TIMINGS = 200
+_timings: "deque[Dict]" = deque(maxlen=MAX_TIMINGS)
+
+
+@contextmanager
+def timed(name: str):
+    """Record how long the wrapped block takes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _timings.append({
+            "name": name,
+            "ms": round(elapsed_ms, 2),
+            "at_ms": round((start - _STARTED) * 1000, 1),
+        })
+        debug_log(f"[STARTUP] {name}: {elapsed_ms:.1f}ms")
+
+
+class LazySingleton(Generic[T]):
+    """Callable returning one shared instance, constructed by factory on the first call."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    with timed(f"init {self.name}"):
+                        self._instance = self.factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def set(self, instance: Optional[T]):
+        """Replace the instance (None = rebuild on next use), e.g. in scripts and benchmarks."""
+        self._instance = instance
+
+
+def lazy_module_attributes(module_name: str, **getters: LazySingleton):
+    """
+    Module __getattr__ exposing lazy singletons under their old attribute
+    names, so `from module import instance` keeps working (and builds it).
+    """
+    def __getattr__(name: str):
+        getter = getters.get(name)
+        if getter is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        return getter()
+    return __getattr__
+
+
+def startup_report() -> Dict:
+    """Recorded timings, slowest first."""
+    timings = sorted(_timings, key=lambda t: t["ms"], reverse=True)
+    return {
+        "uptime_ms": round((time.perf_counter() - _STARTED) * 1000, 1),
+        "total_ms": round(sum(t["ms"] for t in timings), 2),
+        "timings": timings,
+    }
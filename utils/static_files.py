@@ -0,0 +1,130 @@
+"""Static file serving with precompressed variants (see scripts/build_assets.py)."""
+
+import os
+from mimetypes import guess_type
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from utils.debug import debug_log
+
+# Content codings in order of preference, with their file suffixes
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+# Types scripts/build_assets.py may precompress (keep the two lists in sync);
+# these always vary on Accept-Encoding, whether or not a variant exists yet
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".json", ".svg", ".txt", ".html", ".map"}
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a .br/.gz sibling when the client accepts it.
+
+    Variants are discovered once at startup. A variant is only used while its
+    mtime matches the source file, so an edited file without a rebuild is served
+    uncompressed instead of stale.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # {source path: {coding: (variant path, variant stat)}}
+        self.variants: Dict[str, Dict[str, Tuple[str, os.stat_result]]] = {}
+        self.scan()
+
+    def scan(self) -> int:
+        """Index the precompressed variants under the static directory."""
+        variants: Dict[str, Dict[str, Tuple[str, os.stat_result]]] = {}
+        suffixes = {suffix: coding for coding, suffix in ENCODINGS}
+        for directory in self.all_directories:
+            # Absolute paths, matching what lookup_path() hands to file_response()
+            for root, _, files in os.walk(os.path.realpath(directory)):
+                for name in files:
+                    coding = suffixes.get(os.path.splitext(name)[1])
+                    if not coding:
+                        continue
+                    variant_path = os.path.join(root, name)
+                    source_path = variant_path[:-len(os.path.splitext(name)[1])]
+                    try:
+                        variants.setdefault(source_path, {})[coding] = (variant_path, os.stat(variant_path))
+                    except OSError:
+                        continue
+        self.variants = variants
+        debug_log(f"[STATIC] Indexed precompressed variants for {len(variants)} files")
+        return len(variants)
+
+    def _choose_variant(
+        self, full_path: str, stat_result: os.stat_result, accept_encoding: str
+    ) -> Optional[Tuple[str, str, os.stat_result]]:
+        """Best acceptable, up-to-date variant as (coding, path, stat), or None."""
+        available = self.variants.get(str(full_path))
+        if not available or not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        for coding, _ in ENCODINGS:
+            if coding not in available:
+                continue
+            q = accepted.get(coding, accepted.get("*", 0.0))
+            if q <= 0:
+                continue
+            variant_path, variant_stat = available[coding]
+            if variant_stat.st_mtime_ns != stat_result.st_mtime_ns:
+                continue
+            return coding, variant_path, variant_stat
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        has_variants = str(full_path) in self.variants
+
+        variant = None
+        if has_variants:
+            variant = self._choose_variant(full_path, stat_result, request_headers.get("accept-encoding", ""))
+
+        if variant:
+            coding, variant_path, variant_stat = variant
+            # Content type comes from the original name; ETag/length from the variant
+            response = FileResponse(
+                variant_path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                media_type=guess_type(str(full_path))[0] or "text/plain",
+            )
+            response.headers["content-encoding"] = coding
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        if has_variants or os.path.splitext(str(full_path))[1] in COMPRESSIBLE_EXTENSIONS:
+            response.headers["vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,148 @@
+"""
+Voice Synthesizer Backends
+Pluggable text-to-speech backends shared by the app (yoga_voice.py) and the
+pre-generation script. Only depends on the standard library so scripts can
+import it without the app's configuration.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Type
+
+
+# Voice configuration - Indian-British female voice
+VOICE = "en-IN-NeerjaNeural"  # Warm, clear Indian English female
+VOICE_RATE = "-10%"  # Slightly slower for calm delivery
+VOICE_PITCH = "-5Hz"  # Slightly lower for soothing tone
+
+
+class Synthesizer(ABC):
+    """Base class for text-to-speech backends that write MP3 files."""
+
+    name = "base"
+
+    @abstractmethod
+    async def synthesize(self, text: str, output_path: Path) -> None:
+        """Write MP3 audio for text to output_path."""
+
+    def signature(self) -> Dict[str, str]:
+        """Settings that determine the generated audio (a change invalidates cached clips)."""
+        return {"backend": self.name}
+
+    def version(self) -> str:
+        """Short digest of signature() for cache directories, keys and URLs."""
+        encoded = json.dumps(self.signature(), sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:8]
+
+    async def save(self, text: str, output_path: Path) -> bool:
+        """
+        Synthesize into a temp file and move it into place atomically.
+
+        Interrupted or failed generations never leave empty or partial
+        files at output_path. Returns True if output_path was written.
+        """
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(f"{output_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            await self.synthesize(text, tmp_path)
+            if not tmp_path.exists() or tmp_path.stat().st_size == 0:
+                return False
+            os.replace(tmp_path, output_path)
+            return True
+        finally:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class EdgeSynthesizer(Synthesizer):
+    """Microsoft Edge online TTS (default, requires network access)."""
+
+    name = "edge"
+
+    def __init__(self, voice: str = VOICE, rate: str = VOICE_RATE, pitch: str = VOICE_PITCH):
+        self.voice = voice
+        self.rate = rate
+        self.pitch = pitch
+
+    def signature(self) -> Dict[str, str]:
+        return {"backend": self.name, "voice": self.voice, "rate": self.rate, "pitch": self.pitch}
+
+    async def synthesize(self, text: str, output_path: Path) -> None:
+        import edge_tts  # Deferred: only needed when this backend actually runs
+
+        communicate = edge_tts.Communicate(
+            text,
+            voice=self.voice,
+            rate=self.rate,
+            pitch=self.pitch
+        )
+        await communicate.save(str(output_path))
+
+
+class SilentSynthesizer(Synthesizer):
+    """
+    Deterministic offline stand-in that writes valid silent MP3 frames.
+
+    Output matches Edge TTS's format (MPEG-2 Layer III, 24 kHz, 48 kbps mono)
+    and its length grows with the text, so caching, duration scanning and
+    sprite bundling behave as they do with real audio. Used for load tests
+    and benchmarks without network access.
+    """
+
+    name = "silent"
+
+    # MPEG-2 Layer III, no CRC, 48 kbps, 24 kHz, no padding, mono
+    FRAME_HEADER = b"\xff\xf3\x64\xc4"
+    FRAME_BYTES = 144  # 72 * 48000 / 24000
+    FRAME_MS = 24  # 576 samples at 24 kHz
+
+    def __init__(self, ms_per_char: int = 60, min_ms: int = 500):
+        self.ms_per_char = ms_per_char
+        self.min_ms = min_ms
+
+    def signature(self) -> Dict[str, str]:
+        return {"backend": self.name, "ms_per_char": str(self.ms_per_char), "min_ms": str(self.min_ms)}
+
+    def duration_ms(self, text: str) -> int:
+        return max(self.min_ms, len(text) * self.ms_per_char)
+
+    async def synthesize(self, text: str, output_path: Path) -> None:
+        # All-zero side info decodes to silence (no Huffman data, zero gain)
+        frame = self.FRAME_HEADER + bytes(self.FRAME_BYTES - len(self.FRAME_HEADER))
+        frame_count = -(-self.duration_ms(text) // self.FRAME_MS)
+        with open(output_path, "wb") as f:
+            f.write(frame * frame_count)
+
+
+SYNTHESIZERS: Dict[str, Type[Synthesizer]] = {
+    EdgeSynthesizer.name: EdgeSynthesizer,
+    SilentSynthesizer.name: SilentSynthesizer,
+}
+
+
+def get_synthesizer(name: str = "edge") -> Synthesizer:
+    """Create a synthesizer backend by name ("edge" or "silent")."""
+    try:
+        return SYNTHESIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose from: {', '.join(SYNTHESIZERS)}")
+
+
+def voice_subdir(synthesizer: Synthesizer) -> str:
+    """
+    Voice cache subdirectory for a synthesizer's clips.
+
+    The clips in the cache root are the shipped voice (Edge TTS with the
+    default settings). Any other backend or voice settings get their own
+    "<backend>-<version>" directory, so e.g. the silent stand-in never writes
+    over production clips that share its md5 file names.
+    """
+    if synthesizer.signature() == EdgeSynthesizer().signature():
+        return ""
+    return f"{synthesizer.name}-{synthesizer.version()}"
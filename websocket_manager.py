@@ -13,7 +13,7 @@ from fastapi import WebSocket
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
-import time
+from middleware.rate_limit import TokenBucketLimiter, create_store
 from utils.debug import debug_log as _debug_log
 
 
@@ -49,47 +49,48 @@ class YogaRoom:
 
 # Rate limiter for code-based joins (prevents brute force)
 class CodeRateLimiter:
-    """Rate limiter specifically for room code attempts."""
-
-    def __init__(self, max_attempts: int = 5, window_seconds: int = 60, block_seconds: int = 300):
+    """
+    Rate limiter specifically for room code attempts.
+    Failed attempts drain a token bucket (max_attempts per window_seconds);
+    running out blocks the IP for block_seconds.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        window_seconds: int = 60,
+        block_seconds: int = 300,
+        namespace: Optional[str] = None
+    ):
         self.max_attempts = max_attempts
         self.window_seconds = window_seconds
         self.block_seconds = block_seconds
-        self.attempts: Dict[str, list] = {}  # ip -> [timestamps]
-        self.blocked: Dict[str, float] = {}  # ip -> unblock_time
+        # The attempt that would be the max_attempts-th failure triggers the block
+        self.failures = TokenBucketLimiter(
+            rate=max_attempts / window_seconds,
+            burst=max(1, max_attempts - 1),
+            block_seconds=block_seconds,
+            store=create_store(namespace) if namespace else None
+        )
 
     def is_blocked(self, ip: str) -> tuple[bool, int]:
         """Check if IP is blocked. Returns (is_blocked, seconds_remaining)."""
-        if ip in self.blocked:
-            remaining = self.blocked[ip] - time.time()
-            if remaining > 0:
-                return True, int(remaining)
-            del self.blocked[ip]
+        remaining = self.failures.blocked_for(ip)
+        if remaining > 0:
+            return True, int(remaining)
         return False, 0
 
     def record_attempt(self, ip: str, success: bool) -> None:
         """Record a code attempt. Block IP if too many failures."""
         if success:
-            # Clear attempts on success
-            self.attempts.pop(ip, None)
+            # Clear failed attempts on success; an active block still runs its course
+            self.failures.refill(ip)
             return
-
-        now = time.time()
-        if ip not in self.attempts:
-            self.attempts[ip] = []
-
-        # Clean old attempts
-        self.attempts[ip] = [t for t in self.attempts[ip] if now - t < self.window_seconds]
-        self.attempts[ip].append(now)
-
-        # Block if too many attempts
-        if len(self.attempts[ip]) >= self.max_attempts:
-            self.blocked[ip] = now + self.block_seconds
-            self.attempts.pop(ip, None)
+        self.failures.hit(ip)
 
 
 # Global rate limiter for room codes
-code_rate_limiter = CodeRateLimiter()
+code_rate_limiter = CodeRateLimiter(namespace="room-code")
 
 
 class WebSocketManager:
@@ -1,9 +1,8 @@
 """
 Yoga Voice Guide System
-Uses Edge TTS to generate nurturing, calm voice guidance for yoga sessions.
+Uses Edge TTS (or another voice_synth backend) to generate nurturing, calm voice guidance for yoga sessions.
 """
 
-import edge_tts
 import asyncio
 import hashlib
 import os
@@ -11,21 +10,25 @@ import random
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional
+import config as cfg
 from utils.debug import debug_log as _debug_log
+from utils.startup import LazySingleton, lazy_module_attributes
+from voice_synth import Synthesizer, get_synthesizer, voice_subdir
+from services.voice_cache import VoiceCacheIndex, VoiceCacheEntry, VOICE_URL_PREFIX
+from services.audio_sprite import AudioSpriteCache
 
 # Configure logging for voice generation (always enabled)
 logger = logging.getLogger("yoga_voice")
 logger.setLevel(logging.INFO)
 
 
-# Voice configuration - Indian-British female voice
-VOICE = "en-IN-NeerjaNeural"  # Warm, clear Indian English female
-VOICE_RATE = "-10%"  # Slightly slower for calm delivery
-VOICE_PITCH = "-5Hz"  # Slightly lower for soothing tone
-
 # Audio cache directory
 AUDIO_CACHE_DIR = Path("static/audio/voice")
 
+# Seconds to wait after a generated clip before writing the durations sidecar,
+# so a session's worth of new clips costs one write
+DURATIONS_FLUSH_DELAY = 2.0
+
 
 class YogaScriptGenerator:
     """Generates nurturing, linear yoga session scripts."""
@@ -697,11 +700,18 @@ class YogaScriptGenerator:
 
 
 class YogaVoiceGenerator:
-    """Generates audio files using Edge TTS."""
+    """Generates audio files using a pluggable TTS backend (Edge TTS by default)."""
 
-    def __init__(self, cache_dir: Path = AUDIO_CACHE_DIR):
-        self.cache_dir = cache_dir
+    def __init__(self, cache_dir: Optional[Path] = None, synthesizer: Optional[Synthesizer] = None):
+        self.synthesizer = synthesizer or get_synthesizer(cfg.TTS_BACKEND)
+        # Non-default backends and voice settings get their own subdirectory (see voice_subdir)
+        subdir = voice_subdir(self.synthesizer)
+        self.cache_dir = cache_dir or AUDIO_CACHE_DIR / subdir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Built at startup (see lifespan); falls back to a lazy build on first lookup
+        url_prefix = f"{VOICE_URL_PREFIX}/{subdir}" if subdir else VOICE_URL_PREFIX
+        self.index = VoiceCacheIndex(self.cache_dir, url_prefix, version=self.synthesizer.version())
+        self._flush_task: Optional[asyncio.Task] = None
 
     def _get_cache_key(self, text: str) -> str:
         """Generate a cache key for the text."""
@@ -717,29 +727,38 @@ class YogaVoiceGenerator:
         Generate audio for the given text.
         Returns the relative URL path to the audio file, or None if generation fails.
         """
+        entry = await self.generate_audio_entry(text)
+        return entry.url if entry else None
+
+    async def generate_audio_entry(self, text: str) -> Optional[VoiceCacheEntry]:
+        """
+        Generate audio for the given text.
+        Returns the cache entry (URL, size, duration), or None if generation fails.
+        """
         try:
-            cache_path = self._get_cache_path(text)
+            key = self._get_cache_key(text)
 
-            # Return cached if exists
-            if cache_path.exists():
-                return f"/static/audio/voice/{cache_path.name}"
+            # Return cached if indexed (no filesystem access on the hot path)
+            if not self.index.is_built:
+                await asyncio.to_thread(self.index.ensure_built)
+            entry = self.index.get(key)
+            if entry:
+                return entry
+
+            cache_path = self.cache_dir / f"{key}.mp3"
 
             # Ensure cache directory exists
             self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-            # Generate with Edge TTS
-            communicate = edge_tts.Communicate(
-                text,
-                voice=VOICE,
-                rate=VOICE_RATE,
-                pitch=VOICE_PITCH
-            )
-            await communicate.save(str(cache_path))
+            # Generate with the configured backend (written atomically)
+            await self.synthesizer.save(text, cache_path)
 
-            # Verify file was created
-            if cache_path.exists():
+            # Verify file was created and register it in the index
+            entry = await asyncio.to_thread(self.index.add, key)
+            if entry:
                 logger.info(f"[VOICE] Generated audio: {cache_path.name}")
-                return f"/static/audio/voice/{cache_path.name}"
+                self._schedule_flush()
+                return entry
             else:
                 logger.error(f"[VOICE] File not created after generation: {cache_path}")
                 return None
@@ -749,14 +768,26 @@ class YogaVoiceGenerator:
             _debug_log(f"[VOICE] Audio generation failed for '{text[:50]}...': {e}")
             return None
 
+    def _schedule_flush(self):
+        """Write the durations sidecar shortly, once for all clips generated meanwhile."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(DURATIONS_FLUSH_DELAY)
+        # Repeat if clips were added while the previous write was in progress
+        while await asyncio.to_thread(self.index.flush):
+            pass
+
     async def generate_session_audio(self, script: List[Dict]) -> List[Dict]:
         """
         Generate audio for all script items.
-        Returns the script with audio URLs added (None if generation failed).
+        Returns the script with audio URLs and clip durations added (None if generation failed).
         """
         for item in script:
-            audio_url = await self.generate_audio(item["text"])
-            item["audio_url"] = audio_url  # May be None if generation failed
+            entry = await self.generate_audio_entry(item["text"])
+            item["audio_url"] = entry.url if entry else None  # May be None if generation failed
+            item["duration_ms"] = entry.duration_ms if entry else None
         return script
 
     async def pregenerate_common_phrases(self):
@@ -777,12 +808,23 @@ class YogaVoiceGenerator:
             await self.generate_audio(phrase)
 
 
-# Singleton instance
-voice_generator = YogaVoiceGenerator()
+# Singleton instances (built on first use)
+get_voice_generator: LazySingleton[YogaVoiceGenerator] = LazySingleton("voice_generator", YogaVoiceGenerator)
+
+# Per-session sprite bundles built from the voice cache
+get_sprite_cache: LazySingleton[AudioSpriteCache] = LazySingleton(
+    "sprite_cache", lambda: AudioSpriteCache(
+        get_voice_generator().index, voice_version=get_voice_generator().synthesizer.version()
+    )
+)
+
+__getattr__ = lazy_module_attributes(
+    __name__, voice_generator=get_voice_generator, sprite_cache=get_sprite_cache
+)
 
 
 async def test_tts_connectivity() -> dict:
-    """Test Edge TTS connectivity and return diagnostic info."""
+    """Test TTS backend connectivity and return diagnostic info."""
     result = {
         "cache_dir_exists": False,
         "cache_dir_writable": False,
@@ -809,12 +851,12 @@ async def test_tts_connectivity() -> dict:
             result["error"] = f"Write test failed: {e}"
             return result
 
-        # Test Edge TTS
+        # Test the configured TTS backend
+        result["tts_backend"] = get_voice_generator().synthesizer.name
         try:
             test_text = "Test."
-            communicate = edge_tts.Communicate(test_text, voice=VOICE)
             test_path = AUDIO_CACHE_DIR / "tts_test.mp3"
-            await communicate.save(str(test_path))
+            await get_voice_generator().synthesizer.save(test_text, test_path)
 
             if test_path.exists():
                 result["tts_available"] = True
@@ -832,10 +874,93 @@ async def test_tts_connectivity() -> dict:
     return result
 
 
+# Per-phrase fields that move into the phrase table in compact scripts
+PHRASE_FIELDS = ("text", "audio_url", "duration_ms")
+
+
+def compact_voice_script(script: List[Dict]) -> Dict:
+    """
+    Deduplicate a voice script into a phrase table.
+
+    Returns:
+    {
+        "format": "compact",
+        "phrases": [{"text": "...", "audio_url": "...", "duration_ms": 2904}, ...],
+        "pools": [[0, 1, 2], ...],
+        "script": [
+            {"type": "welcome", "timing": "session_start", "phrase": 0},
+            {"type": "pose_correction", "timing": "pose_correction", "pose_index": 0, "pool": 0},
+            ...
+        ]
+    }
+
+    Phrase and pool ids are list indexes. Each pose's run of pose_correction
+    items is collapsed into a single item referencing a shared pool, so the
+    ADJUST_FORM phrases are listed once instead of once per pose.
+    """
+    phrases: List[Dict] = []
+    phrase_ids: Dict[str, int] = {}
+    pools: List[List[int]] = []
+    pool_ids: Dict[tuple, int] = {}
+    compact: List[Dict] = []
+
+    def phrase_id(item: Dict) -> int:
+        text = item["text"]
+        pid = phrase_ids.get(text)
+        if pid is None:
+            pid = len(phrases)
+            phrase_ids[text] = pid
+            phrases.append({k: item[k] for k in PHRASE_FIELDS if k in item})
+        return pid
+
+    i = 0
+    while i < len(script):
+        item = script[i]
+
+        if item.get("type") == "pose_correction":
+            # Collect the contiguous correction run for this pose
+            pose_index = item.get("pose_index")
+            run = []
+            while (
+                i < len(script) and
+                script[i].get("type") == "pose_correction" and
+                script[i].get("pose_index") == pose_index
+            ):
+                run.append(phrase_id(script[i]))
+                i += 1
+
+            run_key = tuple(run)
+            pool_id = pool_ids.get(run_key)
+            if pool_id is None:
+                pool_id = len(pools)
+                pool_ids[run_key] = pool_id
+                pools.append(run)
+
+            compact.append({
+                "type": "pose_correction",
+                "timing": item.get("timing", "pose_correction"),
+                "pose_index": pose_index,
+                "pool": pool_id
+            })
+            continue
+
+        entry = {k: v for k, v in item.items() if k not in PHRASE_FIELDS}
+        entry["phrase"] = phrase_id(item)
+        compact.append(entry)
+        i += 1
+
+    return {
+        "format": "compact",
+        "phrases": phrases,
+        "pools": pools,
+        "script": compact
+    }
+
+
 async def generate_session_voice_script(session_data: Dict) -> List[Dict]:
     """
     Main entry point: Generate complete voice script with audio URLs.
     """
     script = YogaScriptGenerator.generate_session_script(session_data)
-    script_with_audio = await voice_generator.generate_session_audio(script)
+    script_with_audio = await get_voice_generator().generate_session_audio(script)
     return script_with_audio